@@ -1,5 +1,9 @@
 import logging
+import os
 from celery import Celery
+from celery.signals import worker_ready
+
+import metrics  # noqa: F401 (Celery 시그널 기반 지표 수집 및 익스포터 등록)
 
 # 1. 로깅 설정 (JSON/로그 원칙)
 logging.basicConfig(
@@ -9,12 +13,14 @@ logging.basicConfig(
 logger = logging.getLogger("AI-Worker-Core")
 
 # 2. Celery 앱 설정
+REDIS_URL = os.getenv("REDIS_URL") or "redis://redis:6379/0"
+
 # include=['tasks.evaluator', 'tasks.vision']를 통해 무거운 import를 분산함
 app = Celery(
     "ai_worker",
-    broker="redis://redis:6379/0",
-    backend="redis://redis:6379/0",
-    include=['tasks.evaluator', 'tasks.vision']
+    broker=REDIS_URL,
+    backend=REDIS_URL,
+    include=['tasks.evaluator', 'tasks.vision', 'tasks.analytics']
 )
 
 # 3. 성능 최적화 설정
@@ -26,6 +32,22 @@ app.conf.update(
     worker_max_tasks_per_child=10, # 메모리 누수 방지 (64GB 효율 관리)
 )
 
+# 4. 주기 작업 (celery worker --beat): 점수 집계 테이블을 원본 평가로 재계산하여 누락/중복 보정
+#    beat의 첫 실행은 시작 후 ANALYTICS_RECONCILE_SECONDS 뒤이므로, 백필은 worker_ready에서 별도로 실행
+ANALYTICS_RECONCILE_SECONDS = float(os.getenv("ANALYTICS_RECONCILE_SECONDS", "21600"))
+app.conf.beat_schedule = {
+    "reconcile-score-aggregates": {
+        "task": "tasks.analytics.reconcile_score_aggregates",
+        "schedule": ANALYTICS_RECONCILE_SECONDS,
+    },
+}
+
+@worker_ready.connect
+def reconcile_on_startup(sender, **kwargs):
+    """워커 시작 시 집계 재계산 (집계 테이블 신규 생성/장기 중단 후 백필, 증분 갱신 기준점 확보)"""
+    sender.app.send_task("tasks.analytics.reconcile_score_aggregates")
+    logger.info("Queued score aggregate reconciliation on worker startup.")
+
 if __name__ == "__main__":
     logger.info("AI-Worker Celery App initialized.")
     app.start()
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Prometheus 지표 익스포터 (ai-worker)
+
+Celery prefork 자식 프로세스마다 지표가 따로 쌓이므로 PROMETHEUS_MULTIPROC_DIR가 설정되어 있으면
+multiprocess 모드로 집계하여 메인 프로세스의 HTTP 서버(METRICS_PORT)에서 노출합니다.
+
+태스크 헤더의 trace_id / enqueued_at(발행 시각) / captured_at(프레임 캡처 시각)을 읽어
+큐 대기 시간과 프레임→결과 지연을 기록합니다.
+"""
+import logging
+import os
+import time
+from typing import Optional
+
+from celery import signals
+from prometheus_client import CollectorRegistry, Counter, Histogram, start_http_server, multiprocess
+
+logger = logging.getLogger("AI-Worker-Metrics")
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LLM_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "worker_task_queue_wait_seconds", "태스크 발행부터 실행 시작까지 대기 시간",
+    ["task"], buckets=LATENCY_BUCKETS + (60.0, 120.0, 300.0)
+)
+TASK_RUN_SECONDS = Histogram(
+    "worker_task_run_seconds", "태스크 실행 시간",
+    ["task"], buckets=LATENCY_BUCKETS + (60.0, 120.0, 300.0)
+)
+TASK_FAILURES = Counter("worker_task_failures_total", "실패한 태스크 수", ["task"])
+LLM_GENERATION_SECONDS = Histogram(
+    "worker_llm_generation_seconds", "Solar 평가 추론 시간 (prefill + decode)",
+    buckets=LLM_BUCKETS
+)
+LLM_PROMPT_TOKENS = Histogram(
+    "worker_llm_prompt_tokens", "평가 프롬프트 토큰 수 (prefill 부하)",
+    buckets=(128, 256, 512, 1024, 2048, 4096)
+)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "worker_llm_tokens_per_second", "평가 처리량 (프롬프트+출력 토큰/초)",
+    buckets=(5, 10, 20, 50, 100, 200, 500, 1000)
+)
+DB_WRITE_SECONDS = Histogram(
+    "worker_db_write_seconds", "결과 DB 저장 시간",
+    ["target"], buckets=LATENCY_BUCKETS
+)
+FRAME_TO_RESULT_SECONDS = Histogram(
+    "worker_frame_to_result_seconds", "media-server 프레임 캡처부터 감정 분석 결과 저장까지",
+    buckets=LATENCY_BUCKETS + (60.0,)
+)
+
+def task_headers(trace_id: Optional[str] = None, **extra) -> dict:
+    """send_task(headers=...)용 추적 헤더"""
+    headers = {"trace_id": trace_id, "enqueued_at": time.time()}
+    headers.update(extra)
+    return headers
+
+def request_header(request, name: str):
+    """Celery 요청에서 커스텀 헤더 값 조회 (프로토콜 버전에 따라 위치가 다름)"""
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(name)
+    return value
+
+def record_llm(duration: float, prompt_tokens: int, output_tokens: int):
+    LLM_GENERATION_SECONDS.observe(duration)
+    LLM_PROMPT_TOKENS.observe(prompt_tokens)
+    if duration > 0:
+        LLM_TOKENS_PER_SECOND.observe((prompt_tokens + output_tokens) / duration)
+
+class timed_db_write:
+    """with timed_db_write("record_evaluation"): ... 형태로 DB 저장 시간 기록"""
+
+    def __init__(self, target: str):
+        self.target = target
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        DB_WRITE_SECONDS.labels(target=self.target).observe(time.perf_counter() - self.started)
+        return False
+
+# ============== Celery 시그널 연동 ==============
+@signals.task_prerun.connect
+def _on_task_prerun(task_id=None, task=None, **kwargs):
+    task.request._metrics_started = time.perf_counter()
+    enqueued_at = request_header(task.request, "enqueued_at")
+    if enqueued_at:
+        TASK_QUEUE_WAIT_SECONDS.labels(task=task.name).observe(max(time.time() - float(enqueued_at), 0.0))
+    trace_id = request_header(task.request, "trace_id")
+    if trace_id:
+        logger.info(f"[trace={trace_id}] {task.name} 시작 (task_id={task_id})")
+
+@signals.task_postrun.connect
+def _on_task_postrun(task_id=None, task=None, retval=None, **kwargs):
+    started = getattr(task.request, "_metrics_started", None)
+    if started is not None:
+        TASK_RUN_SECONDS.labels(task=task.name).observe(time.perf_counter() - started)
+    # 태스크 내부에서 예외를 잡아 에러 dict를 반환하는 경우도 실패로 집계
+    if isinstance(retval, dict) and (retval.get("status") == "error" or "error" in retval):
+        TASK_FAILURES.labels(task=task.name).inc()
+
+@signals.task_failure.connect
+def _on_task_failure(sender=None, **kwargs):
+    TASK_FAILURES.labels(task=sender.name).inc()
+
+@signals.worker_ready.connect
+def _start_exporter(**kwargs):
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(METRICS_PORT, registry=registry)
+    else:
+        start_http_server(METRICS_PORT)
+    logger.info(f"✅ Prometheus 지표 익스포터 시작: :{METRICS_PORT}/metrics")
+
+@signals.worker_process_shutdown.connect
+def _on_child_shutdown(pid=None, **kwargs):
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid or os.getpid())
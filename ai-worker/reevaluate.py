@@ -0,0 +1,231 @@
+"""
+과거 답변 일괄 재평가 작업 (루브릭 변경 / Solar 모델 교체 시)
+
+답변이 있는 InterviewRecord를 id 순으로 청크 단위 조회하여
+tasks.evaluator.analyze_answer 태스크로 전달하고, 결과는 모아서 일괄 저장합니다.
+
+- 동시에 처리 중인 태스크 수를 --max-inflight로 제한하고, 전용 큐(--queue)를 사용하여
+  실시간 면접 평가 트래픽을 밀어내지 않습니다.
+  전용 워커 실행 예: celery -A main.app worker -Q reevaluation --concurrency 1
+- 연속으로 완료된 마지막 record id를 체크포인트 파일에 기록하므로
+  중단 후 같은 명령으로 다시 실행하면 이어서 진행합니다.
+- 실패/시간 초과된 record id는 체크포인트의 failed_ids에 남으며 --retry-failed로 다시 평가합니다.
+
+사용 예:
+    python reevaluate.py --rubric "기술적 정확성, 논리적 구성" --checkpoint /app/logs/reeval.json
+    python reevaluate.py --rubric "기술적 정확성, 논리적 구성" --checkpoint /app/logs/reeval.json --retry-failed
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from main import app as celery_app
+from db import (
+    bulk_update_record_evaluations, count_answered_records, fetch_answered_records, fetch_answered_records_by_ids
+)
+from metrics import task_headers
+
+logger = logging.getLogger("AI-Worker-Reevaluate")
+
+DEFAULT_RUBRIC = "기술적 정확성, 논리적 구성, 전문 용어 사용 적절성"
+
+class Checkpoint:
+    """재평가 진행 상태 (연속 완료된 마지막 record id, 누적 통계, 실패한 record id)를 파일에 저장"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_record_id = 0
+        self.succeeded = 0
+        # 완료 구간(last_record_id 이하)에 포함됐지만 평가 결과가 저장되지 않은 id
+        self.failed_ids = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.last_record_id = state.get("last_record_id", 0)
+            self.succeeded = state.get("succeeded", 0)
+            self.failed_ids = set(state.get("failed_ids", []))
+
+    @property
+    def failed(self) -> int:
+        return len(self.failed_ids)
+
+    def save(self):
+        # 임시 파일에 쓴 뒤 교체하여 중단 시에도 파일이 깨지지 않도록 함
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "last_record_id": self.last_record_id,
+                "succeeded": self.succeeded,
+                "failed": self.failed,
+                "failed_ids": sorted(self.failed_ids),
+                "updated_at": time.time(),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+class Reevaluator:
+    def __init__(self, rubric: str, checkpoint: Checkpoint, queue: str,
+                 chunk_size: int, max_inflight: int, write_batch_size: int, task_timeout: float):
+        self.rubric = rubric
+        self.checkpoint = checkpoint
+        self.queue = queue
+        self.chunk_size = chunk_size
+        self.max_inflight = max_inflight
+        self.write_batch_size = write_batch_size
+        self.task_timeout = task_timeout
+
+        # record_id -> (AsyncResult, 전송 시각), 전송 순서(= id 순) 유지
+        self.inflight: "OrderedDict[int, tuple]" = OrderedDict()
+        # 완료됐지만 체크포인트보다 앞선 미완료 id가 있어 아직 확정되지 않은 id
+        self.done_ids = set()
+        self.pending_writes = {}
+        self.started_at = time.time()
+        self.processed_this_run = 0
+        self.total = 0
+
+    def run(self, retry_failed: bool = False):
+        retry_ids = sorted(self.checkpoint.failed_ids) if retry_failed else []
+        self.total = count_answered_records(self.checkpoint.last_record_id) + len(retry_ids)
+        logger.info(
+            f"재평가 시작: 대상 {self.total}건 (재시도 {len(retry_ids)}건, "
+            f"last_record_id={self.checkpoint.last_record_id}, queue={self.queue})"
+        )
+
+        # 이전 실행에서 실패한 id 먼저 재시도 (이미 완료 구간이므로 체크포인트 위치는 그대로)
+        for start in range(0, len(retry_ids), self.chunk_size):
+            chunk = retry_ids[start:start + self.chunk_size]
+            records = fetch_answered_records_by_ids(chunk)
+            # 그 사이 삭제되었거나 답변이 지워진 레코드는 재시도 대상에서 제외
+            self.checkpoint.failed_ids.difference_update(set(chunk) - {record_id for record_id, _, _ in records})
+            self._dispatch_all(records)
+
+        cursor = self.checkpoint.last_record_id
+        while True:
+            records = fetch_answered_records(cursor, self.chunk_size)
+            if not records:
+                break
+            self._dispatch_all(records)
+            cursor = records[-1][0]
+
+        while self.inflight:
+            self._collect(block=True)
+        self.flush()
+        self._report(final=True)
+
+    def _dispatch_all(self, records):
+        for record_id, question, answer in records:
+            while len(self.inflight) >= self.max_inflight:
+                self._collect(block=True)
+            self._dispatch(record_id, question, answer)
+            self._collect(block=False)
+
+    def _dispatch(self, record_id: int, question: str, answer: str):
+        result = celery_app.send_task(
+            "tasks.evaluator.analyze_answer",
+            args=[record_id, question, answer, self.rubric],
+            kwargs={"persist": False},
+            queue=self.queue,
+            headers=task_headers(trace_id=f"reeval-{record_id}"),
+        )
+        self.inflight[record_id] = (result, time.time())
+
+    def _collect(self, block: bool):
+        """완료된 태스크 결과 수집. block=True면 최소 1건 완료될 때까지 대기"""
+        while True:
+            finished = False
+            for record_id, (result, sent_at) in list(self.inflight.items()):
+                timed_out = time.time() - sent_at > self.task_timeout
+                if not result.ready() and not timed_out:
+                    continue
+                del self.inflight[record_id]
+                finished = True
+                self._handle_result(record_id, result, timed_out)
+            if finished or not block:
+                break
+            time.sleep(0.2)
+
+        if len(self.pending_writes) >= self.write_batch_size:
+            self.flush()
+
+    def _handle_result(self, record_id: int, result, timed_out: bool):
+        self.processed_this_run += 1
+        self.done_ids.add(record_id)
+        if timed_out and not result.ready():
+            result.revoke()
+            self.checkpoint.failed_ids.add(record_id)
+            logger.warning(f"[{record_id}] 재평가 시간 초과 ({self.task_timeout:.0f}초)")
+            return
+
+        value = result.get(propagate=False) if result.successful() else None
+        if not isinstance(value, dict) or value.get("status") == "error":
+            self.checkpoint.failed_ids.add(record_id)
+            logger.warning(f"[{record_id}] 재평가 실패: {value if value is not None else result.result}")
+            return
+
+        self.checkpoint.succeeded += 1
+        self.checkpoint.failed_ids.discard(record_id)
+        self.pending_writes[record_id] = value
+
+    def flush(self):
+        """모인 평가 결과를 일괄 저장하고, 연속 완료 구간까지 체크포인트 전진"""
+        if self.pending_writes:
+            bulk_update_record_evaluations(self.pending_writes)
+            self.pending_writes = {}
+
+        # 아직 처리 중인 가장 작은 id 직전까지만 완료로 확정
+        oldest_inflight = next(iter(self.inflight), None)
+        confirmed = [i for i in self.done_ids if oldest_inflight is None or i < oldest_inflight]
+        if confirmed:
+            # 재시도한 id는 이미 완료 구간 안에 있으므로 체크포인트를 뒤로 돌리지 않음
+            self.checkpoint.last_record_id = max(self.checkpoint.last_record_id, max(confirmed))
+            self.done_ids.difference_update(confirmed)
+        self.checkpoint.save()
+        self._report()
+
+    def _report(self, final: bool = False):
+        elapsed = max(time.time() - self.started_at, 1e-6)
+        rate = self.processed_this_run / elapsed
+        remaining = max(self.total - self.processed_this_run, 0)
+        eta = remaining / rate if rate > 0 else float("inf")
+        label = "재평가 완료" if final else "재평가 진행"
+        logger.info(
+            f"{label}: {self.processed_this_run}/{self.total} "
+            f"(성공 누적 {self.checkpoint.succeeded}, 실패 {self.checkpoint.failed}건, "
+            f"처리 중 {len(self.inflight)}) {rate:.2f}건/초, ETA {eta:.0f}초"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="과거 답변 일괄 재평가")
+    parser.add_argument("--rubric", default=DEFAULT_RUBRIC, help="평가 루브릭 문자열")
+    parser.add_argument("--checkpoint", default="reevaluate_checkpoint.json", help="체크포인트 파일 경로")
+    parser.add_argument("--queue", default="reevaluation", help="재평가 태스크를 보낼 Celery 큐")
+    parser.add_argument("--chunk-size", type=int, default=200, help="DB에서 한 번에 읽을 레코드 수")
+    parser.add_argument("--max-inflight", type=int, default=4, help="동시에 처리 중일 수 있는 최대 태스크 수")
+    parser.add_argument("--write-batch-size", type=int, default=50, help="결과 일괄 저장 단위")
+    parser.add_argument("--task-timeout", type=float, default=600.0, help="태스크 1건 최대 대기 시간(초)")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터 시작")
+    parser.add_argument("--retry-failed", action="store_true", help="체크포인트의 실패한 id를 먼저 다시 평가")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    reevaluator = Reevaluator(
+        rubric=args.rubric,
+        checkpoint=Checkpoint(args.checkpoint),
+        queue=args.queue,
+        chunk_size=args.chunk_size,
+        max_inflight=args.max_inflight,
+        write_batch_size=args.write_batch_size,
+        task_timeout=args.task_timeout,
+    )
+    try:
+        reevaluator.run(retry_failed=args.retry_failed)
+    except KeyboardInterrupt:
+        logger.warning("중단 요청 수신: 완료된 결과 저장 후 종료합니다.")
+        reevaluator.flush()
+
+if __name__ == "__main__":
+    main()
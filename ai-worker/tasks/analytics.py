@@ -0,0 +1,24 @@
+import logging
+
+from celery import shared_task
+
+from db import rebuild_score_aggregates
+
+logger = logging.getLogger("AI-Worker-Analytics")
+
+@shared_task(name="tasks.analytics.reconcile_score_aggregates")
+def reconcile_score_aggregates():
+    """
+    직무/질문/일자별 점수 집계를 원본 평가로 다시 계산합니다.
+
+    평소에는 평가 저장 시 증분 갱신되므로 이 작업은 보정용입니다.
+    워커 시작 시(worker_ready, 기존 데이터 백필)와 beat 주기(ANALYTICS_RECONCILE_SECONDS)마다 실행되며,
+    수동 실행: celery -A main.app call tasks.analytics.reconcile_score_aggregates
+    """
+    try:
+        rebuilt = rebuild_score_aggregates()
+        logger.info(f"Score aggregates rebuilt: {rebuilt}")
+        return rebuilt
+    except Exception as e:
+        logger.error(f"Score aggregate rebuild failed: {e}")
+        raise
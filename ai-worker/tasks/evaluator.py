@@ -1,13 +1,14 @@
 import logging
+import os
 import time
 import json
 
 from celery import shared_task
-from langchain_community.llms import LlamaCpp
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.pydantic_v1 import BaseModel, Field
 
 from db import update_record_evaluation
+from metrics import record_llm
 # 1. 로깅 설정
 logger = logging.getLogger("AI-Worker-Evaluator")
 
@@ -23,26 +24,39 @@ class EvaluationResult(BaseModel):
 MODEL_PATH = "/app/models/solar-10.7b-instruct-v1.0.Q8_0.gguf"
 parser = JsonOutputParser(pydantic_object=EvaluationResult)
 
-logger.info(f"Loading Solar-10.7B model on RAM: {MODEL_PATH}")
-
-try:
-    eval_llm = LlamaCpp(
-        model_path=MODEL_PATH,
-        n_ctx=4096,
-        n_threads=8,     # Ryzen 4650G의 12스레드 중 8개 사용
-        n_gpu_layers=0,  # CPU/RAM 전용 (GPU는 Backend-core가 선점)
-        temperature=0.1, # 일관된 JSON 출력을 위해 낮은 온도로 고정
-        verbose=False
-    )
-    logger.info("Solar-10.7B model loaded successfully.")
-except Exception as e:
-    logger.error(f"Failed to load Solar model: {str(e)}")
-    raise
+# MODEL_BACKEND=stub이면 모델 파일 없이 결정적인 스텁으로 대체 (벤치마크용)
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "real")
+
+if MODEL_BACKEND == "stub":
+    from stubs import StubLLM
+    eval_llm = StubLLM()
+    logger.info("Using stub evaluation LLM (MODEL_BACKEND=stub)")
+else:
+    from langchain_community.llms import LlamaCpp
+
+    logger.info(f"Loading Solar-10.7B model on RAM: {MODEL_PATH}")
+
+    try:
+        eval_llm = LlamaCpp(
+            model_path=MODEL_PATH,
+            n_ctx=4096,
+            n_threads=8,     # Ryzen 4650G의 12스레드 중 8개 사용
+            n_gpu_layers=0,  # CPU/RAM 전용 (GPU는 Backend-core가 선점)
+            temperature=0.1, # 일관된 JSON 출력을 위해 낮은 온도로 고정
+            verbose=False
+        )
+        logger.info("Solar-10.7B model loaded successfully.")
+    except Exception as e:
+        logger.error(f"Failed to load Solar model: {str(e)}")
+        raise
 
 @shared_task(name="tasks.evaluator.analyze_answer")
-def analyze_answer(record_id, question, user_answer, rubric):
+def analyze_answer(record_id, question, user_answer, rubric, persist=True):
     """
     사용자의 답변을 Solar-10.7B로 정밀 평가하여 JSON 결과를 반환합니다.
+
+    persist=False이면 DB에 저장하지 않고 결과만 반환합니다
+    (재평가 작업처럼 호출자가 결과를 모아서 일괄 저장하는 경우).
     """
     logger.info(f"[{record_id}] 정밀 평가 작업 수신")
     start_time = time.time()
@@ -67,7 +81,13 @@ def analyze_answer(record_id, question, user_answer, rubric):
 
     try:
         # 1. LLM 추론
+        llm_started = time.time()
         raw_output = eval_llm.invoke(prompt)
+        record_llm(
+            time.time() - llm_started,
+            eval_llm.get_num_tokens(prompt),
+            eval_llm.get_num_tokens(raw_output)
+        )
         
         # 2. LangChain 파서로 JSON 정제
         # (Solar가 서술형 답변을 덧붙여도 JSON 부분만 정확히 추출합니다.)
@@ -75,10 +95,11 @@ def analyze_answer(record_id, question, user_answer, rubric):
         
         # 3. 메타데이터 추가
         parsed_data["record_id"] = record_id
-        parsed_data["model"] = "Solar-10.7B-instruct-v1.0-Q8"
+        parsed_data["model"] = "stub" if MODEL_BACKEND == "stub" else "Solar-10.7B-instruct-v1.0-Q8"
         
         # 4. DB 업데이트 (통합 테이블 사용)
-        update_record_evaluation(record_id, parsed_data)
+        if persist:
+            update_record_evaluation(record_id, parsed_data)
         
         duration = time.time() - start_time
         logger.info(f"[{record_id}] 평가 완료 및 DB 저장 완료 (소요시간: {duration:.2f}초)")
@@ -89,9 +110,9 @@ def analyze_answer(record_id, question, user_answer, rubric):
         return parsed_data
 
     except Exception as e:
-        logger.error(f"[{session_id}] 평가 중 오류 발생: {str(e)}", exc_info=True)
+        logger.error(f"[{record_id}] 평가 중 오류 발생: {str(e)}", exc_info=True)
         return {
             "status": "error",
-            "session_id": session_id,
+            "record_id": record_id,
             "message": "Evaluation failed during parsing"
         }
\ No newline at end of file
@@ -1,13 +1,21 @@
 import base64
+import os
 import numpy as np
 import cv2
 import time
 import logging
-from deepface import DeepFace
-from celery import shared_task
+from celery import shared_task, current_task
+
+from metrics import FRAME_TO_RESULT_SECONDS, request_header
 
 logger = logging.getLogger("AI-Worker-Vision")
 
+# MODEL_BACKEND=stub이면 DeepFace 대신 결정적인 스텁 사용 (벤치마크용)
+if os.getenv("MODEL_BACKEND", "real") == "stub":
+    from stubs import StubDeepFace as DeepFace
+else:
+    from deepface import DeepFace
+
 @shared_task(name="tasks.vision.analyze_emotion")
 def analyze_emotion(session_id, base64_img):
     try:
@@ -40,6 +48,11 @@ def analyze_emotion(session_id, base64_img):
         # DB 업데이트 (세션의 최신 감정 상태 업데이트)
         from db import update_session_emotion
         update_session_emotion(session_id, res)
+
+        # media-server 프레임 캡처 시각 기준 종단 지연
+        captured_at = request_header(current_task.request, "captured_at")
+        if captured_at:
+            FRAME_TO_RESULT_SECONDS.observe(max(time.time() - float(captured_at), 0.0))
         
         logger.info(f"[{session_id}] Emotion analyzed and saved: {res['dominant_emotion']}")
         return res
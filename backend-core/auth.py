@@ -1,28 +1,190 @@
 import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlmodel import Session, select
+from sqlmodel import Session
 from database import get_session
 from models import User
+from interview_schema import queries
+
+logger = logging.getLogger("Backend-Core-Auth")
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "1024"))
+# 전체 지원자 데이터 내보내기 등 관리자 전용 API를 허용할 사용자 (쉼표 구분, 미설정 시 아무도 허용하지 않음)
+ADMIN_USERNAMES = {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
+
+# 비밀번호 해싱 설정 (bcrypt cost factor 및 전용 워커 풀 크기)
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# rounds가 바뀌면 기존 해시는 needs_update로 판정되어 로그인 시 재해싱됩니다.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+class PrincipalCache:
+    """토큰 subject(username) -> User 매핑을 보관하는 크기 제한 TTL 캐시
+
+    인증이 필요한 모든 요청마다 발생하던 User 조회 쿼리를 줄이기 위해 사용합니다.
+    사용자 정보가 바뀌면 invalidate()로 즉시 제거해야 합니다.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple[float, User]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[subject]
+                return None
+            self._entries.move_to_end(subject)
+            return user
+
+    def set(self, subject: str, user: User):
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, user)
+            self._entries.move_to_end(subject)
+            # 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            self._entries.pop(subject, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_SIZE)
+
+def invalidate_user(username: str):
+    """사용자 정보 변경(비밀번호, 삭제 등) 시 캐시된 principal 제거"""
+    principal_cache.invalidate(username)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """bcrypt 연산을 이벤트 루프 밖의 제한된 스레드 풀에서 실행
+
+    bcrypt는 해싱 중 GIL을 해제하므로 워커 수만큼 코어를 활용할 수 있습니다.
+    세마포어로 동시에 대기 가능한 작업 수를 제한해 로그인 폭주 시에도
+    다른 API 요청이 밀리지 않도록 합니다.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pwd-hash")
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._pending = 0  # 세마포어 획득 대기 (로그인 폭주 시 실제 대기열)
+        self._queued = 0   # 세마포어 획득 후 스레드 풀 대기
+        self._running = 0
+        self._completed = 0
+        self._total_wait_seconds = 0.0
+        self._total_run_seconds = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_pending)
+        return self._semaphore
+
+    def _dequeue(self, job: dict) -> bool:
+        """queued 카운터를 작업당 한 번만 감소 (워커 시작과 요청 취소 중 먼저 일어난 쪽). _lock 보유 상태에서 호출"""
+        if job["dequeued"]:
+            return False
+        job["dequeued"] = True
+        self._queued -= 1
+        return True
+
+    def _timed(self, func, enqueued_at: float, job: dict, *args):
+        started_at = time.monotonic()
+        with self._lock:
+            self._dequeue(job)
+            self._running += 1
+            self._total_wait_seconds += started_at - enqueued_at
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._total_run_seconds += time.monotonic() - started_at
+
+    async def _run(self, func, *args):
+        enqueued_at = time.monotonic()
+        with self._lock:
+            self._pending += 1
+        try:
+            await self._get_semaphore().acquire()
+        finally:
+            with self._lock:
+                self._pending -= 1
+        job = {"dequeued": False}
+        try:
+            with self._lock:
+                self._queued += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, func, enqueued_at, job, *args)
+        finally:
+            # 요청이 취소되어 작업이 시작되지 않은 경우에도 queued가 계속 남지 않도록 정리
+            with self._lock:
+                self._dequeue(job)
+            self._get_semaphore().release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """검증 결과와, cost factor 변경으로 재해싱이 필요한 경우 새 해시를 반환"""
+        return await self._run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "workers": self._max_workers,
+                "max_pending": self._max_pending,
+                "bcrypt_rounds": BCRYPT_ROUNDS,
+                "pending": self._pending,
+                "in_flight": self._queued + self._running,
+                "queued": self._queued,
+                "running": self._running,
+                "completed": completed,
+                "avg_wait_ms": round(self._total_wait_seconds / completed * 1000, 2) if completed else 0.0,
+                "avg_run_ms": round(self._total_run_seconds / completed * 1000, 2) if completed else 0.0,
+            }
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -46,9 +208,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    
-    statement = select(User).where(User.username == username)
-    user = db.exec(statement).first()
+
+    user = principal_cache.get(username)
+    if user is not None:
+        return user
+
+    # 토큰에 uid 클레임이 있으면 PK 조회, 없으면(구버전 토큰) username 인덱스 조회
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = db.get(User, user_id)
+        if user is not None and user.username != username:
+            user = None
+    else:
+        user = queries.user_by_username(db, username)
     if user is None:
         raise credentials_exception
+
+    # 요청 세션과 분리하여 다른 요청에서도 읽기 전용으로 재사용
+    db.expunge(user)
+    principal_cache.set(username, user)
     return user
+
+async def get_current_admin(current_user: User = Depends(get_current_user)):
+    if current_user.username not in ADMIN_USERNAMES:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
@@ -1,4 +1,5 @@
 import os
+import time
 import logging
 from langchain_huggingface import HuggingFacePipeline
 from langchain_core.prompts import PromptTemplate
@@ -6,6 +7,8 @@ from langchain_core.output_parsers import StrOutputParser
 from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline, BitsAndBytesConfig
 import torch
 
+from metrics import record_generation
+
 logger = logging.getLogger("Backend-Core-LlamaGen")
 
 # 모델 로드 (HuggingFace Pipeline 사용)
@@ -113,10 +116,15 @@ class QuestionGenerator:
             chain = prompt | self.llm | StrOutputParser()
             
             try:
+                started = time.perf_counter()
                 result = chain.invoke({
                     "position": position,
                     "context": context
                 })
+                record_generation(
+                    time.perf_counter() - started,
+                    len(self.tokenizer.encode(result, add_special_tokens=False))
+                )
                 
                 # 생성된 텍스트에서 질문 추출 (불필요한 부분 제거)
                 question = self._extract_question(result)
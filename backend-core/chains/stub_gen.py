@@ -0,0 +1,52 @@
+import os
+import time
+import zlib
+import logging
+
+from metrics import record_generation
+
+logger = logging.getLogger("Backend-Core-StubGen")
+
+# 벤치마크용 지연 설정 (질문 1개당)
+STUB_LLM_LATENCY_MS = float(os.getenv("STUB_LLM_LATENCY_MS", "300"))
+STUB_LATENCY_JITTER = float(os.getenv("STUB_LATENCY_JITTER", "0.2"))  # ±20%
+
+QUESTION_TEMPLATES = [
+    "가장 자신 있는 기술 스택과 그 이유를 설명해주세요.",
+    "최근 진행한 프로젝트에서 맡은 역할은 무엇인가요?",
+    "성능 문제를 해결했던 경험을 구체적으로 공유해주세요.",
+    "코드 리뷰에서 중요하게 생각하는 기준은 무엇인가요?",
+    "장애 상황에서 원인을 추적했던 과정을 설명해주세요.",
+    "팀과 기술적 의견이 달랐던 경험과 해결 방법을 말씀해주세요.",
+    "테스트 전략을 어떻게 설계하는지 설명해주세요.",
+]
+
+def stub_delay(key: str, base_ms: float, jitter: float = STUB_LATENCY_JITTER) -> float:
+    """입력에 따라 결정적인(재현 가능한) 지연 시간(초)"""
+    ratio = (zlib.crc32(key.encode()) % 1000) / 1000.0  # 0.0 ~ 1.0
+    return max(base_ms * (1 + jitter * (2 * ratio - 1)), 0.0) / 1000.0
+
+class StubQuestionGenerator:
+    """
+    QuestionGenerator와 같은 인터페이스의 벤치마크용 스텁 (MODEL_BACKEND=stub)
+
+    모델을 로드하지 않고, 입력에 대해 결정적인 질문과 지연 시간을 반환합니다.
+    실제 모델처럼 호출 스레드를 점유하도록 time.sleep을 사용합니다.
+    """
+
+    def __init__(self):
+        logger.info(f"Using stub question generator (latency={STUB_LLM_LATENCY_MS}ms/question)")
+
+    def generate_questions(self, position: str, count: int = 5, previous_qa: list = None):
+        questions = []
+        offset = len(previous_qa) if previous_qa else 0
+        for i in range(count):
+            key = f"{position}:{offset + i}"
+            started = time.perf_counter()
+            time.sleep(stub_delay(key, STUB_LLM_LATENCY_MS))
+            question = QUESTION_TEMPLATES[(zlib.crc32(key.encode()) + i) % len(QUESTION_TEMPLATES)]
+            record_generation(time.perf_counter() - started, len(question))
+            questions.append(question)
+        return questions
+
+generator = StubQuestionGenerator()
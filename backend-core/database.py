@@ -1,41 +1,59 @@
 import os
-import time
 import logging
-from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy.exc import OperationalError
+from typing import Sequence
+from sqlmodel import SQLModel, Session
+from sqlalchemy import insert
+from interview_schema import create_db_engine, init_db as init_schema
 
 # 로깅 설정 (프로젝트 원칙 적용)
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
-logger = logging.getLogger("Database")
-
-# 환경 변수에서 URL 로드
-DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://admin:1234@db:5432/interview_db")
-
-# echo=True는 개발 단계에서 SQL 쿼리 로그를 볼 수 있어 유용합니다.
-engine = create_engine(
-    DATABASE_URL, 
-    echo=True, 
-    pool_pre_ping=True # 연결이 끊겼는지 미리 확인하는 옵션
-)
+# echo=True는 개발 단계에서 SQL 쿼리 로그를 볼 수 있어 유용합니다. (벤치마크 시 DB_ECHO=false)
+DB_ECHO = os.getenv("DB_ECHO", "true").lower() == "true"
+engine = create_db_engine(echo=DB_ECHO)
 
 def init_db():
-    """DB 연결 시도 및 테이블 생성 (재시도 로직 포함)"""
-    max_retries = 10
-    for i in range(max_retries):
-        try:
-            logger.info(f"데이터베이스 연결 시도 중... ({i+1}/{max_retries})")
-            SQLModel.metadata.create_all(engine)
-            logger.info("✅ 데이터베이스 테이블 생성 및 연결 성공")
-            return
-        except OperationalError as e:
-            if i < max_retries - 1:
-                logger.warning(f"⚠️ DB 연결 실패, 3초 후 재시도합니다... 에러: {e}")
-                time.sleep(3)
-            else:
-                logger.error("❌ DB 연결 실패: 최대 재시도 횟수를 초과했습니다.")
-                raise e
+    """DB 연결 시도 및 테이블/인덱스 생성 (공통 스키마 패키지 사용)"""
+    init_schema(engine)
 
 def get_session():
     """FastAPI Dependency Injection용 세션 생성기"""
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def bulk_insert(session: Session, objects: Sequence[SQLModel], returning=None):
+    """
+    같은 모델의 여러 행을 단일 INSERT(executemany/insertmanyvalues)로 저장합니다.
+
+    행마다 add()/refresh()를 반복하는 대신 한 번의 왕복으로 처리하며,
+    commit은 호출자가 결정합니다 (같은 트랜잭션 안에서 사용).
+
+    Args:
+        session: 현재 트랜잭션의 DB 세션
+        objects: 저장할 모델 인스턴스 리스트 (모두 같은 타입)
+        returning: RETURNING으로 돌려받을 컬럼 리스트 (예: [InterviewRecord.id])
+
+    Returns:
+        list: returning 지정 시 objects와 같은 순서의 Row 리스트, 아니면 빈 리스트
+    """
+    if not objects:
+        return []
+
+    model = type(objects[0])
+    columns = model.__table__.columns
+    rows = []
+    for obj in objects:
+        row = {}
+        for column in columns:
+            value = getattr(obj, column.key)
+            # 자동 증가 PK는 DB가 채우도록 제외
+            if column.primary_key and value is None:
+                continue
+            row[column.key] = value
+        rows.append(row)
+
+    statement = insert(model)
+    if returning:
+        # insertmanyvalues 배치의 RETURNING 행 순서는 보장되지 않으므로 입력 순서로 정렬 요청
+        return session.execute(statement.returning(*returning, sort_by_parameter_order=True), rows).all()
+    session.execute(statement, rows)
+    return []
@@ -0,0 +1,191 @@
+"""
+면접 세션/평가 데이터 스트리밍 내보내기 (NDJSON, CSV)
+
+서버 사이드 커서(yield_per)로 행을 조금씩 읽어 바로 직렬화하므로
+내보내는 행 수와 무관하게 메모리 사용량이 일정합니다.
+
+CLI 사용 예:
+    python export.py --format ndjson --start 2026-01-01 --end 2026-02-01 > sessions.ndjson
+    python export.py --format csv --position "Backend 개발자" --cursor <token> > records.csv
+"""
+import argparse
+import base64
+import csv
+import io
+import json
+import logging
+import sys
+from datetime import datetime
+from itertools import groupby
+from typing import Iterator, Optional
+
+from sqlmodel import Session, select
+
+from database import engine
+from models import InterviewSession, InterviewRecord
+
+logger = logging.getLogger("Backend-Core-Export")
+
+EXPORT_FORMATS = ("ndjson", "csv")
+YIELD_PER = 500
+
+CSV_COLUMNS = [
+    "session_id", "user_id", "user_name", "position", "session_status", "session_created_at",
+    "session_emotion", "record_id", "order", "question", "answer", "answered_at",
+    "evaluation", "emotion", "speech", "cursor",
+]
+
+def encode_cursor(session_id: int) -> str:
+    """마지막으로 내보낸 session id를 재개용 토큰으로 변환"""
+    return base64.urlsafe_b64encode(json.dumps({"sid": session_id}).encode()).decode()
+
+def decode_cursor(token: Optional[str]) -> int:
+    """재개 토큰을 session id로 복원 (없으면 0). 잘못된 토큰은 ValueError"""
+    if not token:
+        return 0
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(token.encode()))["sid"])
+    except Exception as e:
+        raise ValueError(f"Invalid export cursor: {token}") from e
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+def iter_sessions(
+    db: Session,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    position: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> Iterator[dict]:
+    """
+    조건에 맞는 세션을 id 순으로 하나씩 (질문/답변/평가 포함) 반환합니다.
+
+    Args:
+        db: DB 세션 (스트리밍이 끝날 때까지 열려 있어야 함)
+        start, end: 세션 생성 시각 범위 [start, end)
+        position: 지원 직무 필터 (정확히 일치)
+        cursor: 이전 내보내기에서 받은 재개 토큰
+    """
+    statement = (
+        select(InterviewSession, InterviewRecord)
+        .outerjoin(InterviewRecord, InterviewRecord.session_id == InterviewSession.id)
+        .where(InterviewSession.id > decode_cursor(cursor))
+        .order_by(InterviewSession.id, InterviewRecord.order)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    if start:
+        statement = statement.where(InterviewSession.created_at >= start)
+    if end:
+        statement = statement.where(InterviewSession.created_at < end)
+    if position:
+        statement = statement.where(InterviewSession.position == position)
+
+    # ORM identity map은 약한 참조이므로 처리가 끝난 객체는 바로 해제됩니다.
+    rows = db.exec(statement)
+    for _, session_rows in groupby(rows, key=lambda row: row[0].id):
+        session_rows = list(session_rows)
+        interview_session = session_rows[0][0]
+        yield {
+            "session_id": interview_session.id,
+            "user_id": interview_session.user_id,
+            "user_name": interview_session.user_name,
+            "position": interview_session.position,
+            "status": interview_session.status,
+            "created_at": _isoformat(interview_session.created_at),
+            "emotion_summary": interview_session.emotion_summary,
+            "records": [
+                {
+                    "record_id": record.id,
+                    "order": record.order,
+                    "question": record.question_text,
+                    "answer": record.answer_text,
+                    "answered_at": _isoformat(record.answered_at),
+                    "evaluation": record.evaluation,
+                    "emotion": record.emotion_summary,
+                    "speech": record.speech_metrics,
+                }
+                for _, record in session_rows
+                if record is not None
+            ],
+            "cursor": encode_cursor(interview_session.id),
+        }
+
+def to_ndjson(sessions: Iterator[dict]) -> Iterator[str]:
+    """세션 하나당 JSON 한 줄"""
+    for item in sessions:
+        yield json.dumps(item, ensure_ascii=False) + "\n"
+
+def to_csv(sessions: Iterator[dict]) -> Iterator[str]:
+    """질문(레코드) 하나당 CSV 한 행 (JSONB 컬럼은 JSON 문자열로 기록)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+    for item in sessions:
+        session_emotion = json.dumps(item["emotion_summary"], ensure_ascii=False) if item["emotion_summary"] else ""
+        for record in item["records"] or [{}]:
+            writer.writerow([
+                item["session_id"], item["user_id"], item["user_name"], item["position"],
+                item["status"], item["created_at"], session_emotion,
+                record.get("record_id"), record.get("order"), record.get("question"),
+                record.get("answer"), record.get("answered_at"),
+                json.dumps(record["evaluation"], ensure_ascii=False) if record.get("evaluation") else "",
+                json.dumps(record["emotion"], ensure_ascii=False) if record.get("emotion") else "",
+                json.dumps(record["speech"], ensure_ascii=False) if record.get("speech") else "",
+                item["cursor"],
+            ])
+        yield flush()
+
+def stream_export(
+    export_format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    position: Optional[str] = None,
+    cursor: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    전용 DB 세션을 열어 내보내기 스트림을 생성합니다.
+
+    FastAPI 의존성 세션은 응답 전송 전에 닫히므로 StreamingResponse에서는
+    이 함수처럼 제너레이터 내부에서 세션을 관리해야 합니다.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    decode_cursor(cursor)  # 스트림 시작 전에 토큰 검증
+
+    serializer = to_ndjson if export_format == "ndjson" else to_csv
+
+    def generate():
+        with Session(engine) as db:
+            yield from serializer(iter_sessions(db, start, end, position, cursor))
+
+    return generate()
+
+def main():
+    parser = argparse.ArgumentParser(description="면접 세션/평가 데이터 내보내기")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="세션 생성 시작 시각 (ISO 8601, 포함)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="세션 생성 종료 시각 (ISO 8601, 미포함)")
+    parser.add_argument("--position", help="지원 직무 필터")
+    parser.add_argument("--cursor", help="이전 내보내기의 마지막 cursor 값 (이어서 내보내기)")
+    parser.add_argument("--output", help="출력 파일 경로 (기본: stdout)")
+    args = parser.parse_args()
+
+    output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        for chunk in stream_export(args.format, args.start, args.end, args.position, args.cursor):
+            output.write(chunk)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+질문 생성 LLM(Llama) 호출 게이트
+
+세션 생성, 적응형 꼬리 질문 선행 생성, 질문 은행 보충이 모두 같은 GPU 모델을 사용하므로
+모든 generate_questions 호출을 하나의 세마포어로 제한합니다 (6GB VRAM에서 동시 생성 방지).
+
+asyncio 태스크를 취소해도 스레드의 생성은 멈추지 않으므로, 세마포어는 대기 중인 코루틴이 아니라
+스레드가 실제로 끝날 때 반환합니다.
+"""
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger("Backend-Core-Generation")
+
+# 이전 설정 이름(SPECULATIVE_MAX_CONCURRENCY)도 허용
+GENERATION_MAX_CONCURRENCY = int(
+    os.getenv("GENERATION_MAX_CONCURRENCY") or os.getenv("SPECULATIVE_MAX_CONCURRENCY") or "1"
+)
+
+class GenerationGate:
+    def __init__(self, generator, max_concurrency: int = GENERATION_MAX_CONCURRENCY):
+        self.generator = generator
+        self._max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphore
+
+    async def submit(self, position: str, count: int, previous_qa: Optional[list] = None) -> asyncio.Future:
+        """
+        생성 슬롯을 얻은 뒤 스레드에서 생성을 시작하고 그 Future를 반환합니다.
+
+        반환된 Future는 취소해도 스레드가 끝날 때까지 슬롯을 점유하므로 asyncio.shield로 기다려야 합니다.
+        """
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        generation = asyncio.ensure_future(run_in_threadpool(
+            self.generator.generate_questions, position, count, previous_qa
+        ))
+        generation.add_done_callback(lambda future: self._release(semaphore, future))
+        return generation
+
+    async def generate(self, position: str, count: int, previous_qa: Optional[list] = None) -> List[str]:
+        generation = await self.submit(position, count, previous_qa)
+        return await asyncio.shield(generation)
+
+    @staticmethod
+    def _release(semaphore: asyncio.Semaphore, future: asyncio.Future):
+        semaphore.release()
+        # 기다리던 쪽이 취소된 경우에도 예외를 회수하여 경고 로그 방지
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug(f"생성 실패 (대기 측 취소 가능): {future.exception()}")
@@ -1,30 +1,70 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, status, Header, Request, BackgroundTasks
+from fastapi.responses import StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import Session, select
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
 from celery import Celery
+import hmac
 import logging
+import os
+import time
+from typing import Dict, Any, Optional
 # from dotenv import load_dotenv
 
 # load_dotenv()
 
-from database import engine, init_db, get_session
+from database import engine, init_db, get_session, bulk_insert
 from models import InterviewSession, InterviewRecord, User, SessionCreate
-from chains.llama_gen import generator
-from auth import get_password_hash, verify_password, create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from interview_schema import queries, analytics
+# MODEL_BACKEND=stub이면 Llama 대신 결정적인 스텁 생성기 사용 (벤치마크용)
+if os.getenv("MODEL_BACKEND", "real") == "stub":
+    from chains.stub_gen import generator
+else:
+    from chains.llama_gen import generator
+from export import stream_export
+from generation import GenerationGate
+from speculative import SpeculativeFollowUps
+from question_bank import question_bank
+import metrics
+from auth import password_hasher, create_access_token, get_current_user, get_current_admin, invalidate_user, ACCESS_TOKEN_EXPIRE_MINUTES
 from fastapi.security import OAuth2PasswordRequestForm
-from datetime import timedelta, datetime
+from datetime import timedelta, datetime, date
 
 # 1. 로깅 및 앱 초기화
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("Backend-Core")
 
 app = FastAPI(title="AI Interview Backend")
+metrics.instrument_engine(engine)
 
 # DB 초기화
 @app.on_event("startup")
 def on_startup():
     init_db()
     logger.info("Database initialized.")
+    with Session(engine) as db:
+        question_bank.build(db)
+
+# 요청별 trace id 발급 및 지연 시간 기록
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    trace_id = request.headers.get(metrics.TRACE_HEADER) or metrics.new_trace_id()
+    token = metrics.set_trace_id(trace_id)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers[metrics.TRACE_HEADER] = trace_id
+        return response
+    finally:
+        route = request.scope.get("route")
+        metrics.HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=route.path if route else "unmatched",
+            status=status_code
+        ).observe(time.perf_counter() - started)
+        metrics.reset_trace_id(token)
 
 # CORS 설정
 app.add_middleware(
@@ -36,7 +76,16 @@ app.add_middleware(
 )
 
 # 2. Celery 설정 (ai-worker 통신용)
-celery_app = Celery("ai_worker", broker="redis://redis:6379/0", backend="redis://redis:6379/0")
+REDIS_URL = os.getenv("REDIS_URL") or "redis://redis:6379/0"
+celery_app = Celery("ai_worker", broker=REDIS_URL, backend=REDIS_URL)
+
+# 모든 질문 생성(세션 생성, 꼬리 질문, 질문 은행 보충)은 같은 게이트로 GPU 동시 실행 수를 제한
+generation_gate = GenerationGate(generator)
+# 적응형 면접: STT 전사 기반 꼬리 질문 선행 생성
+speculative = SpeculativeFollowUps(generation_gate)
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+if not INTERNAL_API_TOKEN:
+    logger.warning("⚠️ INTERNAL_API_TOKEN이 설정되지 않아 /internal API(전사, 음성 지표)를 거부합니다.")
 
 # 3. API 엔드포인트
 
@@ -47,82 +96,130 @@ async def root():
 @app.post("/register")
 async def register(user: User, db: Session = Depends(get_session)):
     # Check if user exists
-    statement = select(User).where(User.username == user.username)
-    db_user = db.exec(statement).first()
+    db_user = queries.user_by_username(db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    user.hashed_password = get_password_hash(user.hashed_password)
+    user.hashed_password = await password_hasher.hash(user.hashed_password)
     db.add(user)
     db.commit()
     db.refresh(user)
+    invalidate_user(user.username)
     return {"username": user.username, "id": user.id}
 
 @app.post("/token")
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_session)):
-    statement = select(User).where(User.username == form_data.username)
-    user = db.exec(statement).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = queries.user_by_username(db, form_data.username)
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    # cost factor(BCRYPT_ROUNDS)가 바뀐 경우 로그인 시점에 투명하게 재해싱
+    if new_hash:
+        user.hashed_password = new_hash
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        invalidate_user(user.username)
+        logger.info(f"Rehashed password for user: {user.username}")
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus 스크레이프 엔드포인트"""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/auth/stats")
+async def auth_stats(current_user: User = Depends(get_current_admin)):
+    """비밀번호 해싱 워커 풀 대기열 지표"""
+    return password_hasher.stats()
+
 @app.get("/users/me")
 async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+async def refill_question_bank(position: str, count: int):
+    """세션 생성 응답 이후 새 질문을 생성하여 은행에 추가 (요청 경로에서 LLM 대기 없이 은행 확장)"""
+    try:
+        new_questions = await generation_gate.generate(position, count)
+        added = await run_in_threadpool(question_bank.add, position, new_questions)
+        logger.info(f"Question bank refilled for position: {position} (+{added})")
+    except Exception as e:
+        logger.warning(f"Question bank refill failed for position {position}: {e}")
+
 @app.post("/sessions", response_model=InterviewSession)
 async def create_session(
     session_data: SessionCreate, 
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    # SessionCreate 데이터를 바탕으로 InterviewSession 생성
+    # 적응형 모드는 첫 질문만 준비하고 이후 질문은 답변에 따라 생성
+    question_count = 1 if session_data.adaptive else 5
+
+    # 1) 질문 은행에서 유사 직무의 기존 질문 재사용 (임계값 미만이면 빈 리스트)
+    generated_questions = await run_in_threadpool(question_bank.retrieve, session_data.position, question_count)
+    if generated_questions:
+        logger.info(f"Reused {len(generated_questions)} questions from question bank for position: {session_data.position}")
+
+    # 2) 부족한 만큼만 생성 (DB 트랜잭션을 열기 전에 수행하여 커넥션 점유 시간 최소화)
+    missing = question_count - len(generated_questions)
+    if missing > 0:
+        try:
+            logger.info(f"Generating {missing} AI questions for position: {session_data.position}")
+            new_questions = await generation_gate.generate(session_data.position, missing)
+            await run_in_threadpool(question_bank.add, session_data.position, new_questions)
+            logger.info(f"Generated {len(new_questions)} questions successfully")
+        except Exception as e:
+            logger.error(f"Question generation failed: {str(e)}, using fallback questions")
+            new_questions = [
+                f"{session_data.position} 직무의 핵심 역량은 무엇인가요?",
+                "최근 진행한 프로젝트에 대해 설명해주세요.",
+                "기술적 문제를 해결한 경험을 공유해주세요."
+            ][:missing]
+        generated_questions += new_questions
+    elif await run_in_threadpool(question_bank.needs_refill, session_data.position):
+        # 은행에서 모두 채운 경우: 후보가 적거나 일정 비율이면 응답 후 백그라운드로 보충
+        background_tasks.add_task(refill_question_bank, session_data.position, question_count)
+
+    # 세션 + 질문 레코드를 하나의 트랜잭션으로 저장
     new_session = InterviewSession(
         user_id=current_user.id,
         user_name=session_data.user_name,
-        position=session_data.position
+        position=session_data.position,
+        adaptive=session_data.adaptive
     )
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
-    
-    logger.info(f"Created session with ID: {new_session.id}")
-    
-    # 질문 생성 로직
-    try:
-        logger.info(f"Generating AI questions for position: {new_session.position}")
-        generated_questions = generator.generate_questions(
-            position=new_session.position,
-            count=5,
-        )
-        logger.info(f"Generated {len(generated_questions)} questions successfully")
-    except Exception as e:
-        logger.error(f"Question generation failed: {str(e)}, using fallback questions")
-        generated_questions = [
-            f"{new_session.position} 직무의 핵심 역량은 무엇인가요?",
-            "최근 진행한 프로젝트에 대해 설명해주세요.",
-            "기술적 문제를 해결한 경험을 공유해주세요."
-        ]
-    
-    # DB에 InterviewRecord 형태로 저장
-    for i, q_text in enumerate(generated_questions):
-        record = InterviewRecord(
+    db.flush()  # INSERT ... RETURNING id (커밋 없이 session id 확보)
+
+    # DB에 InterviewRecord 형태로 일괄 저장 (단일 INSERT)
+    records = [
+        InterviewRecord(
             session_id=new_session.id,
             question_text=q_text,
             order=i + 1
         )
-        db.add(record)
-    
+        for i, q_text in enumerate(generated_questions)
+    ]
+    record_ids = bulk_insert(db, records, returning=[InterviewRecord.id])
+
     db.commit()
     db.refresh(new_session)
+    logger.info(f"Created session with ID: {new_session.id} ({len(records)} questions)")
+
+    if session_data.adaptive:
+        speculative.enable(new_session.id, new_session.position)
+        speculative.set_current(new_session.id, record_ids[0].id, records[0].question_text)
     return new_session
 
 @app.get("/sessions/{session_id}/questions", response_model=list[InterviewRecord])
@@ -131,9 +228,7 @@ async def get_questions(
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    statement = select(InterviewRecord).where(InterviewRecord.session_id == session_id).order_by(InterviewRecord.order)
-    results = db.exec(statement).all()
-    return results
+    return queries.session_records(db, session_id)
 
 @app.post("/answers")
 async def submit_answer(
@@ -165,10 +260,64 @@ async def submit_answer(
             record.question_text,
             record.answer_text,
             "기술적 정확성, 논리적 구성, 전문 용어 사용 적절성"
-        ]
+        ],
+        headers=metrics.task_headers()
     )
-    
-    return {"status": "submitted", "record_id": record.id}
+    metrics.TASKS_SENT.labels(task="tasks.evaluator.analyze_answer").inc()
+
+    # 4. 적응형 세션이면 (선행 생성된) 꼬리 질문을 다음 순서로 저장
+    next_record = None
+    if speculative.is_enabled(record.session_id):
+        next_text = await speculative.resolve(record.session_id, record.id, answer_text)
+        if next_text:
+            next_record = InterviewRecord(
+                session_id=record.session_id,
+                question_text=next_text,
+                order=record.order + 1
+            )
+            db.add(next_record)
+            db.commit()
+            db.refresh(next_record)
+            speculative.set_current(record.session_id, next_record.id, next_text)
+
+    return {"status": "submitted", "record_id": record.id, "next_question": next_record}
+
+def verify_internal_token(x_internal_token: Optional[str] = Header(default=None)):
+    """서비스 간 내부 호출 인증 (INTERNAL_API_TOKEN 미설정 시 내부 API 전체 거부)"""
+    if not INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Internal API disabled")
+    if not x_internal_token or not hmac.compare_digest(x_internal_token, INTERNAL_API_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token")
+
+@app.post("/internal/sessions/{session_id}/transcript", dependencies=[Depends(verify_internal_token)])
+async def receive_transcript(session_id: int, transcript_data: Dict[str, Any]):
+    """media-server가 전달하는 실시간 STT 전사 (적응형 세션의 꼬리 질문 선행 생성용)"""
+    adaptive = speculative.on_transcript(
+        session_id,
+        transcript_data.get("text", ""),
+        transcript_data.get("is_final", True)
+    )
+    return {"adaptive": adaptive}
+
+@app.post(
+    "/internal/sessions/{session_id}/records/{record_id}/speech-metrics",
+    dependencies=[Depends(verify_internal_token)]
+)
+async def receive_speech_metrics(
+    session_id: int,
+    record_id: int,
+    speech_metrics: Dict[str, Any],
+    db: Session = Depends(get_session)
+):
+    """media-server가 답변 구간 오디오에서 계산한 음성 지표 저장"""
+    record = db.get(InterviewRecord, record_id)
+    if not record or record.session_id != session_id:
+        raise HTTPException(status_code=404, detail="Record not found")
+
+    record.speech_metrics = speech_metrics
+    db.add(record)
+    db.commit()
+    return {"status": "saved", "record_id": record_id}
 
 @app.get("/sessions/{session_id}/results")
 async def get_session_results(
@@ -176,19 +325,75 @@ async def get_session_results(
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    statement = select(InterviewRecord).where(InterviewRecord.session_id == session_id).order_by(InterviewRecord.order)
-    results = db.exec(statement).all()
+    results = queries.session_records(db, session_id)
     
     return [
         {
             "question": r.question_text,
             "answer": r.answer_text,
             "evaluation": r.evaluation,
-            "emotion": r.emotion_summary
+            "emotion": r.emotion_summary,
+            "speech": r.speech_metrics
         }
         for r in results
     ]
 
+@app.get("/export/sessions")
+async def export_sessions(
+    format: str = "ndjson",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    position: Optional[str] = None,
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_admin)
+):
+    """세션/질문/평가/감정 데이터를 NDJSON 또는 CSV로 스트리밍 (관리자 전용, cursor로 이어받기 가능)"""
+    try:
+        chunks = stream_export(format, start, end, position, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=sessions.{format}"}
+    )
+
+# ============== 직무별 평가 통계 (ai-worker가 증분 갱신하는 집계 테이블만 조회) ==============
+# 직무명은 자유 입력이라 "/"를 포함할 수 있으므로 (예: "AI/ML 엔지니어") path 변환기 사용
+@app.get("/analytics/positions")
+async def get_position_stats(
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_admin)
+):
+    return analytics.position_summaries(db)
+
+@app.get("/analytics/positions/{position:path}/questions")
+async def get_question_stats(
+    position: str,
+    limit: int = 50,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_admin)
+):
+    """직무 내 질문별 평균 점수 (답변 수 많은 순)"""
+    return analytics.question_summaries(db, position, max(1, min(limit, 500)))
+
+@app.get("/analytics/positions/{position:path}/trend")
+async def get_position_trend(
+    position: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_admin)
+):
+    """일자별 평균 점수 추이 (기본: 최근 30일, UTC 기준)"""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return analytics.daily_trend(db, position, start, end)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Prometheus 지표 및 trace id 전파 (backend-core)
+
+- HTTP 요청 지연, DB 쿼리 시간, 질문 생성(LLM) 시간/토큰 처리량 히스토그램
+- 요청마다 trace id를 발급(X-Trace-Id 헤더 재사용)하고 Celery 태스크 헤더로 전달하여
+  POST /answers → analyze_answer → DB 저장 구간을 같은 id로 추적합니다.
+"""
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy import event
+
+TRACE_HEADER = "X-Trace-Id"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LLM_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "backend_http_request_seconds", "HTTP 요청 처리 시간",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+DB_QUERY_SECONDS = Histogram(
+    "backend_db_query_seconds", "DB 쿼리 실행 시간 (SQL 종류별)",
+    ["operation"], buckets=LATENCY_BUCKETS
+)
+LLM_GENERATION_SECONDS = Histogram(
+    "backend_llm_generation_seconds", "질문 1개 생성 시간 (prefill + decode)",
+    buckets=LLM_BUCKETS
+)
+LLM_OUTPUT_TOKENS = Histogram(
+    "backend_llm_output_tokens", "질문 1개 생성 시 출력 토큰 수",
+    buckets=(8, 16, 32, 48, 64, 80, 128)
+)
+LLM_TOKENS_PER_SECOND = Histogram(
+    "backend_llm_tokens_per_second", "질문 생성 디코딩 처리량 (출력 토큰/초)",
+    buckets=(1, 2, 5, 10, 20, 40, 80, 160)
+)
+TASKS_SENT = Counter("backend_celery_tasks_sent_total", "ai-worker로 전달한 태스크 수", ["task"])
+
+_trace_id: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+def current_trace_id() -> Optional[str]:
+    return _trace_id.get()
+
+def set_trace_id(trace_id: str):
+    return _trace_id.set(trace_id)
+
+def reset_trace_id(token):
+    _trace_id.reset(token)
+
+def task_headers() -> dict:
+    """Celery send_task(headers=...)에 넣을 추적 헤더 (큐 대기 시간 측정용 enqueue 시각 포함)"""
+    return {"trace_id": current_trace_id() or new_trace_id(), "enqueued_at": time.time()}
+
+def record_generation(duration: float, output_tokens: int):
+    LLM_GENERATION_SECONDS.observe(duration)
+    LLM_OUTPUT_TOKENS.observe(output_tokens)
+    if duration > 0 and output_tokens:
+        LLM_TOKENS_PER_SECOND.observe(output_tokens / duration)
+
+def instrument_engine(engine):
+    """SQLAlchemy 엔진의 모든 쿼리 실행 시간을 SQL 종류(SELECT/INSERT/UPDATE...)별로 기록"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        operation = statement.lstrip().split(" ", 1)[0].upper() or "OTHER"
+        DB_QUERY_SECONDS.labels(operation=operation).observe(time.perf_counter() - started)
+
+def render_latest():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,244 @@
+"""
+질문 은행: 저장된 면접 질문을 임베딩하여 직무(position) 유사도로 재사용
+
+직무명은 자유 입력이라("백엔드 개발자", "Backend 개발자", "서버 개발자") 표기만 달라도
+매번 새 질문 생성이 일어납니다. 과거 InterviewRecord의 질문을 정규화된 임베딩 행렬(float32)로
+보관하고, 새 직무와 코사인 유사도가 임계값 이상인 직무의 질문 중 k개를 중복 없이 반환합니다.
+
+같은 직무의 질문은 유사도가 모두 같으므로, 유사도 가중 무작위 추출로 지원자마다 다른 질문을 고릅니다.
+적응형 세션의 꼬리 질문은 특정 지원자의 이전 답변에 의존하므로 은행에 넣지 않습니다.
+은행 보충(새 질문 생성)은 세션 생성 응답 이후 백그라운드에서 수행합니다 (needs_refill).
+임베딩 계산은 블로킹이므로 요청 처리 중에는 run_in_threadpool로 호출합니다.
+"""
+import logging
+import os
+import threading
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import or_
+from sqlmodel import Session, select
+
+from models import InterviewSession, InterviewRecord
+
+logger = logging.getLogger("Backend-Core-QuestionBank")
+
+EMBEDDING_MODEL_ID = os.getenv("EMBEDDING_MODEL_ID", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "cpu")  # GPU는 Llama 질문 생성이 사용
+QUESTION_BANK_MIN_SIMILARITY = float(os.getenv("QUESTION_BANK_MIN_SIMILARITY", "0.85"))
+QUESTION_BANK_DUPLICATE_SIMILARITY = float(os.getenv("QUESTION_BANK_DUPLICATE_SIMILARITY", "0.9"))
+# 추출 온도: 낮을수록 유사도가 높은 직무의 질문을 선호 (같은 직무 질문끼리는 균등)
+QUESTION_BANK_SAMPLING_TEMPERATURE = float(os.getenv("QUESTION_BANK_SAMPLING_TEMPERATURE", "0.05"))
+# 은행 보충(응답 후 백그라운드 생성): 후보 질문이 목표 수보다 적거나, 일정 비율의 세션에서 실행
+QUESTION_BANK_TARGET_POOL = int(os.getenv("QUESTION_BANK_TARGET_POOL", "20"))
+QUESTION_BANK_REFILL_RATE = float(os.getenv("QUESTION_BANK_REFILL_RATE", "0.1"))
+HASHING_DIM = 512
+
+try:
+    from sentence_transformers import SentenceTransformer
+    # 벤치마크(MODEL_BACKEND=stub)에서는 임베딩 모델도 로드하지 않음
+    USE_SENTENCE_TRANSFORMERS = os.getenv("MODEL_BACKEND", "real") != "stub"
+except ImportError as e:
+    logger.warning(f"⚠️ sentence-transformers import error: {e}. 문자 n-gram 해시 임베딩을 사용합니다.")
+    USE_SENTENCE_TRANSFORMERS = False
+
+class HashingEmbedder:
+    """외부 모델 없이 동작하는 문자 n-gram 해시 임베딩 (표기 변형 정도만 구분)"""
+
+    def __init__(self, dim: int = HASHING_DIM, ngram: int = 2):
+        self.dim = dim
+        self.ngram = ngram
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            text = "".join(text.lower().split())
+            for i in range(max(len(text) - self.ngram + 1, 1)):
+                bucket = zlib.crc32(text[i:i + self.ngram].encode()) % self.dim
+                vectors[row, bucket] += 1.0
+        return vectors
+
+class SentenceEmbedder:
+    def __init__(self, model_id: str, device: str):
+        logger.info(f"Loading embedding model: {model_id} ({device})")
+        self.model = SentenceTransformer(model_id, device=device)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(texts, batch_size=64, convert_to_numpy=True).astype(np.float32)
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+class GrowableMatrix:
+    """행 추가 시 용량을 2배씩 늘리는 float32 행렬 (매번 vstack 복사 방지)"""
+
+    def __init__(self, dim: int, capacity: int = 256):
+        self._data = np.zeros((capacity, dim), dtype=np.float32)
+        self.size = 0
+
+    @property
+    def view(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    def append(self, rows: np.ndarray) -> int:
+        """행을 추가하고 첫 행의 인덱스를 반환"""
+        needed = self.size + len(rows)
+        if needed > len(self._data):
+            capacity = max(needed, len(self._data) * 2)
+            grown = np.zeros((capacity, self._data.shape[1]), dtype=np.float32)
+            grown[:self.size] = self.view
+            self._data = grown
+        start = self.size
+        self._data[start:needed] = rows
+        self.size = needed
+        return start
+
+class QuestionBank:
+    """
+    직무/질문 임베딩 인덱스
+
+    - positions: 고유 직무명 임베딩 (m, d)
+    - questions: 질문 임베딩 (n, d), question_position[i]는 질문 i가 속한 직무 인덱스
+    """
+
+    def __init__(self, embedder=None, seed: Optional[int] = None):
+        self._embedder = embedder
+        self._rng = np.random.default_rng(seed)
+        self._lock = threading.Lock()
+        self._position_index = {}
+        self._question_keys = set()
+        self._questions: List[str] = []
+        self._question_position: List[int] = []
+        self._position_matrix: Optional[GrowableMatrix] = None
+        self._question_matrix: Optional[GrowableMatrix] = None
+        self.ready = False
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = (
+                SentenceEmbedder(EMBEDDING_MODEL_ID, EMBEDDING_DEVICE)
+                if USE_SENTENCE_TRANSFORMERS else HashingEmbedder()
+            )
+        return self._embedder
+
+    def __len__(self) -> int:
+        return len(self._questions)
+
+    def build(self, db: Session):
+        """DB에 저장된 (직무, 질문) 쌍으로 인덱스를 구성합니다 (적응형 세션은 첫 질문만)."""
+        statement = (
+            select(InterviewSession.position, InterviewRecord.question_text)
+            .join(InterviewRecord, InterviewRecord.session_id == InterviewSession.id)
+            .where(or_(InterviewSession.adaptive.is_(False), InterviewRecord.order == 1))
+            .distinct()
+        )
+        pairs = db.exec(statement).all()
+        added = self.add_pairs(pairs)
+        self.ready = True
+        logger.info(f"✅ 질문 은행 구성 완료: 질문 {added}개 / 직무 {len(self._position_index)}개")
+
+    def add(self, position: str, questions: List[str]) -> int:
+        return self.add_pairs([(position, q) for q in questions])
+
+    def add_pairs(self, pairs: List[Tuple[str, str]]) -> int:
+        # 직무명이 그대로 들어간 템플릿(폴백) 질문은 다른 직무에 재사용할 수 없으므로 제외
+        pairs = [
+            (position.strip(), question.strip()) for position, question in pairs
+            if position and question and position.strip() not in question
+        ]
+        pairs = [p for p in dict.fromkeys(pairs) if p not in self._question_keys]
+        if not pairs:
+            return 0
+        # 임베딩 계산은 잠금 밖에서 수행 (동시 retrieve를 막지 않도록)
+        positions = list(dict.fromkeys(p for p, _ in pairs))
+        position_vectors = dict(zip(positions, _normalize(self.embedder.encode(positions))))
+        question_vectors = _normalize(self.embedder.encode([q for _, q in pairs]))
+
+        with self._lock:
+            keep = [i for i, pair in enumerate(pairs) if pair not in self._question_keys]
+            if not keep:
+                return 0
+            pairs = [pairs[i] for i in keep]
+            question_vectors = question_vectors[keep]
+
+            new_positions = list(dict.fromkeys(p for p, _ in pairs if p not in self._position_index))
+            if self._question_matrix is None:
+                dim = question_vectors.shape[1]
+                self._question_matrix = GrowableMatrix(dim)
+                self._position_matrix = GrowableMatrix(dim)
+            if new_positions:
+                start = self._position_matrix.append(np.stack([position_vectors[p] for p in new_positions]))
+                for offset, position in enumerate(new_positions):
+                    self._position_index[position] = start + offset
+
+            self._question_matrix.append(question_vectors)
+            for position, question in pairs:
+                self._questions.append(question)
+                self._question_position.append(self._position_index[position])
+                self._question_keys.add((position, question))
+            return len(pairs)
+
+    def retrieve(self, position: str, count: int, min_similarity: float = QUESTION_BANK_MIN_SIMILARITY) -> List[str]:
+        """
+        새 직무와 유사한 직무의 질문을 중복 없이 최대 count개 반환합니다.
+
+        임계값 이상인 후보를 exp(유사도 / 온도) 가중치로 비복원 추출하므로 호출마다 다른 조합이 나옵니다.
+
+        Returns:
+            list: 추출 순서의 질문 (임계값 이상인 후보가 부족하면 count보다 적음)
+        """
+        if not self._questions:
+            return []
+        query = _normalize(self.embedder.encode([position.strip()]))[0]
+        with self._lock:
+            candidates, question_scores = self._candidates(query, min_similarity)
+            if len(candidates) == 0:
+                return []
+            selected: List[int] = []
+            question_matrix = self._question_matrix.view
+            for idx in self._sampled(candidates, question_scores):
+                if selected and np.max(question_matrix[selected] @ question_matrix[idx]) >= QUESTION_BANK_DUPLICATE_SIMILARITY:
+                    continue
+                selected.append(int(idx))
+                if len(selected) == count:
+                    break
+            return [self._questions[i] for i in selected]
+
+    def pool_size(self, position: str, min_similarity: float = QUESTION_BANK_MIN_SIMILARITY) -> int:
+        """새 직무에 재사용할 수 있는 (임계값 이상) 후보 질문 수"""
+        if not self._questions:
+            return 0
+        query = _normalize(self.embedder.encode([position.strip()]))[0]
+        with self._lock:
+            return len(self._candidates(query, min_similarity)[0])
+
+    def _candidates(self, query: np.ndarray, min_similarity: float):
+        position_scores = self._position_matrix.view @ query
+        question_scores = position_scores[np.asarray(self._question_position)]
+        return np.flatnonzero(question_scores >= min_similarity), question_scores
+
+    def needs_refill(self, position: str) -> bool:
+        """후보가 목표 수보다 적거나 QUESTION_BANK_REFILL_RATE 확률로 보충 필요"""
+        if self.pool_size(position) < QUESTION_BANK_TARGET_POOL:
+            return True
+        with self._lock:
+            return self._rng.random() < QUESTION_BANK_REFILL_RATE
+
+    def _sampled(self, candidates: np.ndarray, scores: np.ndarray) -> np.ndarray:
+        """
+        가중 비복원 추출 순서로 후보 인덱스를 반환합니다.
+
+        Efraimidis-Spirakis: 키 = log(u) / w 의 내림차순이 가중치 w에 비례한 비복원 추출과 같음
+        """
+        candidate_scores = scores[candidates]
+        weights = np.exp((candidate_scores - candidate_scores.max()) / QUESTION_BANK_SAMPLING_TEMPERATURE)
+        keys = np.log(self._rng.random(len(candidates))) / np.maximum(weights, 1e-30)
+        return candidates[np.argsort(-keys)]
+
+# 싱글톤 (startup 시 DB에서 구성)
+question_bank = QuestionBank()
@@ -0,0 +1,205 @@
+"""
+적응형 면접: 실시간 STT 전사 기반 꼬리 질문 선행(speculative) 생성
+
+media-server가 전달하는 답변 전사(transcript)가 충분히 쌓이면, 지원자가 말하는 도중에
+다음 꼬리 질문 생성을 미리 시작합니다. /answers로 최종 답변이 도착하면
+선행 생성에 사용한 전사와 최종 답변을 비교해 결과를 확정하거나 폐기(재생성)합니다.
+
+세션 상태는 프로세스 메모리에만 보관합니다 (재시작 시 일반 모드처럼 동작).
+중간에 이탈한 세션은 ADAPTIVE_SESSION_TTL_SECONDS 동안 활동이 없으면 제거합니다.
+"""
+import asyncio
+import logging
+import os
+import time
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("Backend-Core-Speculative")
+
+ADAPTIVE_MAX_QUESTIONS = int(os.getenv("ADAPTIVE_MAX_QUESTIONS", "5"))
+SPECULATIVE_MIN_WORDS = int(os.getenv("SPECULATIVE_MIN_WORDS", "15"))
+SPECULATIVE_DELTA_WORDS = int(os.getenv("SPECULATIVE_DELTA_WORDS", "10"))
+SPECULATIVE_MATCH_THRESHOLD = float(os.getenv("SPECULATIVE_MATCH_THRESHOLD", "0.8"))
+ADAPTIVE_SESSION_TTL_SECONDS = float(os.getenv("ADAPTIVE_SESSION_TTL_SECONDS", "1800"))
+ADAPTIVE_SWEEP_INTERVAL_SECONDS = 60.0
+
+class AdaptiveSessionState:
+    def __init__(self, position: str, max_questions: int):
+        self.position = position
+        self.max_questions = max_questions
+        self.history: List[dict] = []
+        self.last_active = time.monotonic()
+
+        # 현재 답변 중인 질문
+        self.record_id: Optional[int] = None
+        self.question: Optional[str] = None
+        self.final_text = ""
+        self.interim_text = ""
+
+        # 선행 생성 상태 (generation은 취소된 뒤에도 스레드가 끝날 때까지 남아 있음)
+        self.task: Optional[asyncio.Task] = None
+        self.generation: Optional[asyncio.Future] = None
+        self.snapshot = ""
+        self.snapshot_words = 0
+
+    @property
+    def transcript(self) -> str:
+        return f"{self.final_text} {self.interim_text}".strip()
+
+    @property
+    def generating(self) -> bool:
+        return self.generation is not None and not self.generation.done()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def reset_answer(self, record_id: Optional[int], question: Optional[str]):
+        self.record_id = record_id
+        self.question = question
+        self.final_text = ""
+        self.interim_text = ""
+        self.cancel()
+
+    def cancel(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+        self.task = None
+        self.snapshot = ""
+        self.snapshot_words = 0
+
+class SpeculativeFollowUps:
+    def __init__(self, gate):
+        # 세션 생성/질문 은행 보충과 같은 GenerationGate를 공유하여 GPU 동시 생성 수를 함께 제한
+        self.gate = gate
+        self._sessions: Dict[int, AdaptiveSessionState] = {}
+        self._last_sweep = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def enable(self, session_id: int, position: str, max_questions: int = ADAPTIVE_MAX_QUESTIONS):
+        self._evict_idle()
+        self._sessions[session_id] = AdaptiveSessionState(position, max_questions)
+
+    def is_enabled(self, session_id: int) -> bool:
+        self._evict_idle()
+        return session_id in self._sessions
+
+    def _evict_idle(self):
+        """ADAPTIVE_SESSION_TTL_SECONDS 동안 전사/답변이 없는 세션 제거 (최대 1분에 한 번 검사)"""
+        now = time.monotonic()
+        if now - self._last_sweep < ADAPTIVE_SWEEP_INTERVAL_SECONDS:
+            return
+        self._last_sweep = now
+        idle = [sid for sid, state in self._sessions.items() if now - state.last_active > ADAPTIVE_SESSION_TTL_SECONDS]
+        for session_id in idle:
+            self.discard(session_id)
+        if idle:
+            self.evicted += len(idle)
+            logger.info(f"유휴 적응형 세션 {len(idle)}개 제거")
+
+    def discard(self, session_id: int):
+        state = self._sessions.pop(session_id, None)
+        if state is not None:
+            state.cancel()
+
+    def set_current(self, session_id: int, record_id: int, question: str):
+        """지원자가 답변할 질문이 바뀔 때 호출 (전사 및 선행 생성 초기화)"""
+        state = self._sessions.get(session_id)
+        if state is not None:
+            state.touch()
+            state.reset_answer(record_id, question)
+
+    def on_transcript(self, session_id: int, text: str, is_final: bool = True) -> bool:
+        """
+        STT 전사 조각을 반영하고 필요하면 선행 생성을 시작합니다.
+
+        Returns:
+            bool: 적응형 세션 여부 (False면 호출자가 전달을 중단해도 됨)
+        """
+        state = self._sessions.get(session_id)
+        if state is None:
+            return False
+        state.touch()
+        if state.record_id is None or not text:
+            return True
+
+        if is_final:
+            state.final_text = f"{state.final_text} {text}".strip()
+            state.interim_text = ""
+        else:
+            state.interim_text = text
+
+        transcript = state.transcript
+        words = len(transcript.split())
+        if words < SPECULATIVE_MIN_WORDS or words - state.snapshot_words < SPECULATIVE_DELTA_WORDS:
+            return True
+        # 이미 생성 중이면 (취소됐지만 스레드가 아직 실행 중인 경우 포함) 끝난 뒤 다음 전사에서 다시 판단
+        if (state.task is not None and not state.task.done()) or state.generating:
+            return True
+
+        state.snapshot = transcript
+        state.snapshot_words = words
+        state.task = asyncio.create_task(self._generate(state, state.question, transcript))
+        logger.info(f"[{session_id}] 꼬리 질문 선행 생성 시작 (전사 {words}단어)")
+        return True
+
+    async def _generate(self, state: AdaptiveSessionState, question: str, answer: str) -> Optional[str]:
+        previous_qa = state.history + [{"question": question, "answer": answer}]
+        # 태스크가 취소돼도 generation은 스레드가 끝날 때까지 남아 재시작 여부 판단에 사용
+        generation = await self.gate.submit(state.position, 1, previous_qa)
+        state.generation = generation
+        questions = await asyncio.shield(generation)
+        return questions[0] if questions else None
+
+    async def resolve(self, session_id: int, record_id: int, answer_text: str) -> Optional[str]:
+        """
+        최종 답변 도착 시 다음 꼬리 질문을 확정합니다.
+
+        선행 생성에 사용한 전사가 최종 답변과 충분히 비슷하면 그 결과를 사용하고,
+        아니면 선행 결과를 취소하고 최종 답변으로 새로 생성합니다.
+
+        Returns:
+            Optional[str]: 다음 질문 (최대 질문 수에 도달했거나 현재 질문이 아니면 None)
+        """
+        state = self._sessions.get(session_id)
+        if state is None or state.record_id != record_id:
+            return None
+        state.touch()
+
+        question = state.question
+        if len(state.history) + 1 >= state.max_questions:
+            # 마지막 질문에 대한 답변: 세션 상태 정리
+            self.discard(session_id)
+            return None
+
+        next_question = None
+        similarity = SequenceMatcher(None, state.snapshot, answer_text).ratio() if state.task else 0.0
+        if state.task is not None and similarity >= SPECULATIVE_MATCH_THRESHOLD:
+            try:
+                next_question = await state.task
+                self.hits += 1
+                logger.info(f"[{session_id}] 선행 생성 질문 확정 (유사도 {similarity:.2f})")
+            except Exception as e:
+                logger.warning(f"[{session_id}] 선행 생성 실패, 재생성합니다: {e}")
+        else:
+            self.misses += 1
+            if state.task is not None:
+                logger.info(f"[{session_id}] 선행 생성 질문 폐기 (유사도 {similarity:.2f})")
+            state.cancel()
+
+        if not next_question:
+            next_question = await self._generate(state, question, answer_text)
+
+        state.history.append({"question": question, "answer": answer_text})
+        state.reset_answer(None, None)
+        return next_question
+
+    def stats(self) -> dict:
+        return {
+            "adaptive_sessions": len(self._sessions),
+            "speculation_hits": self.hits,
+            "speculation_misses": self.misses,
+            "evicted_sessions": self.evicted,
+        }
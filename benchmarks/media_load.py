@@ -0,0 +1,481 @@
+"""
+media-server 용량 측정 (합성 WebRTC 세션 부하)
+
+aiortc로 N개의 루프백 peer connection을 /offer에 연결하고 (합성 얼굴 영상 + 음성 톤, 또는 녹화 클립)
+/ws/{session_id} WebSocket까지 구독한 상태에서 N을 단계적으로 늘리며 다음을 측정합니다.
+
+- media-server 이벤트 루프 지연 (media_event_loop_lag_seconds 구간 증가분)
+- 전송/샘플링된 프레임 수, Celery 발행 수, STT 메시지 수
+- media-server 프로세스 CPU/메모리 (전체 및 세션당)
+- STT 종단 지연: 대체 STT 서버가 결과를 보낸 시각 → 브라우저 역할 WebSocket 수신 시각
+
+외부 서비스는 모두 로컬 대체물로 바꿉니다.
+- Deepgram → 이 프로세스 안의 Deepgram 호환 STT WebSocket (STT_WS_URL)
+- Celery 브로커 → memory:// (media_server_entry가 큐를 주기적으로 비워 미소비 프레임이 RSS에 누적되지 않음)
+- backend-core 전사 전달 → 항상 {"adaptive": false}를 돌려주는 대체 엔드포인트
+
+실행 예:
+    python benchmarks/media_load.py --spawn --steps 1 5 10 20 --hold 30 --json-out media.json
+    python benchmarks/media_load.py --spawn --video-file clip.mp4 --audio-file clip.mp4
+
+부하 생성기 자체의 CPU 사용이 결과를 왜곡하지 않도록 media-server와 다른 코어/머신에서 실행하는 것을 권장합니다.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import cv2
+import numpy as np
+import psutil
+from aiohttp import web
+from aiortc import RTCPeerConnection, RTCSessionDescription, VideoStreamTrack, AudioStreamTrack
+from aiortc.contrib.media import MediaPlayer, MediaBlackhole
+from av import VideoFrame
+from prometheus_client.parser import text_string_to_metric_families
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ============== 합성 미디어 트랙 ==============
+FACE_CYCLE_FRAMES = 30
+_face_frames: List[np.ndarray] = []
+
+def face_frames(width: int = 640, height: int = 480) -> List[np.ndarray]:
+    """입 모양과 시선이 움직이는 합성 얼굴 프레임 (모든 세션이 공유, 1회만 생성)"""
+    if not _face_frames:
+        cx, cy = width // 2, height // 2
+        for i in range(FACE_CYCLE_FRAMES):
+            phase = 2 * np.pi * i / FACE_CYCLE_FRAMES
+            img = np.full((height, width, 3), (60, 50, 40), dtype=np.uint8)
+            cv2.ellipse(img, (cx, cy), (110, 145), 0, 0, 360, (150, 180, 225), -1)
+            gaze = int(6 * np.sin(phase))
+            for ex in (cx - 42, cx + 42):
+                cv2.ellipse(img, (ex, cy - 35), (20, 11), 0, 0, 360, (255, 255, 255), -1)
+                cv2.circle(img, (ex + gaze, cy - 35), 7, (40, 30, 20), -1)
+            mouth_open = 4 + int(14 * abs(np.sin(phase)))
+            cv2.ellipse(img, (cx, cy + 60), (38, mouth_open), 0, 0, 360, (60, 60, 150), -1)
+            _face_frames.append(img)
+    return _face_frames
+
+class SyntheticFaceTrack(VideoStreamTrack):
+    def __init__(self, offset: int = 0):
+        super().__init__()
+        self.offset = offset
+        self.frames_sent = 0
+
+    async def recv(self):
+        pts, time_base = await self.next_timestamp()
+        frames = face_frames()
+        frame = VideoFrame.from_ndarray(frames[(self.frames_sent + self.offset) % len(frames)], format="bgr24")
+        frame.pts = pts
+        frame.time_base = time_base
+        self.frames_sent += 1
+        return frame
+
+class SyntheticVoiceTrack(AudioStreamTrack):
+    """음절처럼 끊어지는 톤 + 발화 사이 침묵이 반복되는 합성 음성 (8kHz mono)"""
+    SAMPLE_RATE = 8000
+
+    def __init__(self, offset: int = 0):
+        super().__init__()
+        t = np.arange(self.SAMPLE_RATE * 4) / self.SAMPLE_RATE
+        envelope = (np.sin(2 * np.pi * 4 * t) > 0) * (t < 3.0)  # 3초 발화(초당 4음절) + 1초 침묵
+        pitch = 160 + 40 * np.sin(2 * np.pi * 0.5 * t)
+        self.samples = (envelope * 8000 * np.sin(2 * np.pi * np.cumsum(pitch) / self.SAMPLE_RATE)).astype(np.int16)
+        self.offset = offset * 1000
+        self.frames_sent = 0
+
+    async def recv(self):
+        frame = await super().recv()
+        start = (frame.pts + self.offset) % len(self.samples)
+        chunk = np.take(self.samples, range(start, start + frame.samples), mode="wrap")
+        frame.planes[0].update(chunk.tobytes())
+        self.frames_sent += 1
+        return frame
+
+class CountingTrack:
+    """녹화 클립(MediaPlayer) 트랙의 전송 프레임 수 집계용 래퍼"""
+
+    def __init__(self, track):
+        self.track = track
+        self.frames_sent = 0
+        original_recv = track.recv
+
+        async def recv():
+            frame = await original_recv()
+            self.frames_sent += 1
+            return frame
+
+        track.recv = recv
+
+# ============== 대체 STT / backend 서버 ==============
+class StandInServices:
+    """
+    Deepgram 호환 STT WebSocket + backend-core 전사 수신 엔드포인트
+
+    오디오 바이트를 받는 동안 interval마다 전사 결과를 보내고, 보낸 시각을 기록하여
+    WebSocket 수신 측에서 종단 지연을 계산할 수 있게 합니다.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.sent_at: Dict[Tuple[str, str], float] = {}
+        self.audio_bytes: Dict[str, int] = defaultdict(int)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self, host: str, port: int):
+        app = web.Application()
+        app.router.add_get("/listen", self._listen)
+        app.router.add_post("/internal/sessions/{session_id}/transcript", self._transcript)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    async def _listen(self, request: web.Request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        session_id = request.query.get("session_id", "unknown")
+        seq = 0
+        last_emit = time.perf_counter()
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.BINARY:
+                continue
+            self.audio_bytes[session_id] += len(msg.data)
+            now = time.perf_counter()
+            if now - last_emit < self.interval:
+                continue
+            last_emit = now
+            seq += 1
+            text = f"bench transcript {seq}"
+            self.sent_at[(session_id, text)] = now
+            await ws.send_json({"channel": {"alternatives": [{"transcript": text}]}, "is_final": True})
+        return ws
+
+    async def _transcript(self, request: web.Request):
+        return web.json_response({"adaptive": False})
+
+# ============== 세션 클라이언트 ==============
+class SyntheticSession:
+    def __init__(self, session_id: str, args, stand_in: StandInServices, offset: int):
+        self.session_id = session_id
+        self.args = args
+        self.stand_in = stand_in
+        self.offset = offset
+        self.pc = RTCPeerConnection()
+        self.blackhole = MediaBlackhole()
+        self.tracks = []
+        self.players = []
+        self.stt_latencies: List[Tuple[float, float]] = []  # (수신 시각, 지연)
+        self.ws_task: Optional[asyncio.Task] = None
+        self.setup_seconds: Optional[float] = None
+
+    @property
+    def frames_sent(self) -> Dict[str, int]:
+        sent = defaultdict(int)
+        for kind, track in self.tracks:
+            sent[kind] += track.frames_sent
+        return sent
+
+    def _add_tracks(self):
+        if self.args.video_file:
+            player = MediaPlayer(self.args.video_file, loop=True)
+            self.players.append(player)
+            if player.video:
+                self.tracks.append(("video", CountingTrack(player.video)))
+                self.pc.addTrack(player.video)
+        else:
+            video = SyntheticFaceTrack(self.offset)
+            self.tracks.append(("video", video))
+            self.pc.addTrack(video)
+
+        if self.args.audio_file:
+            player = MediaPlayer(self.args.audio_file, loop=True)
+            self.players.append(player)
+            if player.audio:
+                self.tracks.append(("audio", CountingTrack(player.audio)))
+                self.pc.addTrack(player.audio)
+        else:
+            audio = SyntheticVoiceTrack(self.offset)
+            self.tracks.append(("audio", audio))
+            self.pc.addTrack(audio)
+
+    async def connect(self, http: aiohttp.ClientSession):
+        started = time.perf_counter()
+
+        @self.pc.on("track")
+        def on_track(track):
+            self.blackhole.addTrack(track)
+
+        self._add_tracks()
+        self.ws_task = asyncio.create_task(self._consume_ws(http))
+
+        offer = await self.pc.createOffer()
+        await self.pc.setLocalDescription(offer)
+        async with http.post(f"{self.args.base_url}/offer", json={
+            "sdp": self.pc.localDescription.sdp,
+            "type": self.pc.localDescription.type,
+            "session_id": self.session_id
+        }) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"/offer HTTP {resp.status}: {await resp.text()}")
+            answer = await resp.json()
+        await self.pc.setRemoteDescription(RTCSessionDescription(sdp=answer["sdp"], type=answer["type"]))
+        await self.blackhole.start()
+        self.setup_seconds = time.perf_counter() - started
+
+    async def _consume_ws(self, http: aiohttp.ClientSession):
+        ws_url = self.args.base_url.replace("http", "ws", 1) + f"/ws/{self.session_id}"
+        try:
+            async with http.ws_connect(ws_url) as ws:
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    received = time.perf_counter()
+                    data = json.loads(msg.data)
+                    messages = data["messages"] if data.get("type") == "batch" else [data]
+                    for message in messages:
+                        sent = self.stand_in.sent_at.pop((self.session_id, message.get("text")), None)
+                        if message.get("type") == "stt_result" and sent is not None:
+                            self.stt_latencies.append((received, received - sent))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[{self.session_id}] WebSocket 에러: {e!r}", file=sys.stderr)
+
+    async def close(self, http: aiohttp.ClientSession):
+        try:
+            async with http.post(f"{self.args.base_url}/hangup", json={"session_id": self.session_id}):
+                pass
+        except aiohttp.ClientError:
+            pass
+        if self.ws_task is not None:
+            self.ws_task.cancel()
+        await self.blackhole.stop()
+        await self.pc.close()
+        for player in self.players:
+            for track in (player.audio, player.video):
+                if track is not None:
+                    track.stop()
+
+# ============== 서버 지표 수집 ==============
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+async def scrape_metrics(http: aiohttp.ClientSession, base_url: str) -> Dict[MetricKey, float]:
+    async with http.get(f"{base_url}/metrics") as resp:
+        text = await resp.text()
+    samples = {}
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            samples[(sample.name, tuple(sorted(sample.labels.items())))] = sample.value
+    return samples
+
+def counter_delta(before: dict, after: dict, name: str) -> float:
+    total = 0.0
+    for key, value in after.items():
+        if key[0] == name:
+            total += value - before.get(key, 0.0)
+    return total
+
+def histogram_summary(before: dict, after: dict, name: str) -> dict:
+    """구간 증가분으로 평균과 p50/p95/p99 상한(버킷 경계) 계산"""
+    count = counter_delta(before, after, f"{name}_count")
+    if not count:
+        return {"count": 0}
+    total = counter_delta(before, after, f"{name}_sum")
+    buckets = sorted(
+        (float(dict(key[1])["le"]), value - before.get(key, 0.0))
+        for key, value in after.items() if key[0] == f"{name}_bucket"
+    )
+    summary = {"count": int(count), "mean_ms": round(total / count * 1000, 2)}
+    for pct in (50, 95, 99):
+        bound = next((le for le, cumulative in buckets if cumulative >= count * pct / 100), float("inf"))
+        summary[f"p{pct}_ms_le"] = None if bound == float("inf") else round(bound * 1000, 2)
+    return summary
+
+def percentiles_ms(values: List[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    array = np.array(values) * 1000
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(array, 50)), 1),
+        "p95_ms": round(float(np.percentile(array, 95)), 1),
+        "p99_ms": round(float(np.percentile(array, 99)), 1),
+        "max_ms": round(float(array.max()), 1),
+    }
+
+# ============== 단계별 부하 실행 ==============
+async def run_steps(args, server_pid: Optional[int]) -> dict:
+    stand_in = StandInServices(args.stt_interval)
+    await stand_in.start("127.0.0.1", args.stand_in_port)
+    process = psutil.Process(server_pid) if server_pid else None
+    run_id = uuid.uuid4().hex[:6]
+    sessions: List[SyntheticSession] = []
+    rejected = 0
+    report_steps = []
+
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30)) as http:
+        await wait_until_ready(http, args.base_url)
+        baseline_rss = process.memory_info().rss if process else None
+
+        try:
+            for target in args.steps:
+                new_sessions = [
+                    SyntheticSession(f"bench-{run_id}-{i}", args, stand_in, offset=i)
+                    for i in range(len(sessions), target)
+                ]
+                results = await asyncio.gather(*(s.connect(http) for s in new_sessions), return_exceptions=True)
+                for session, result in zip(new_sessions, results):
+                    if isinstance(result, Exception):
+                        rejected += 1
+                        print(f"[{session.session_id}] 연결 실패: {result}", file=sys.stderr)
+                        await session.close(http)
+                    else:
+                        sessions.append(session)
+
+                await asyncio.sleep(args.warmup)
+                before = await scrape_metrics(http, args.base_url)
+                frames_before = [s.frames_sent for s in sessions]
+                if process:
+                    process.cpu_percent(None)
+                window_started = time.perf_counter()
+
+                await asyncio.sleep(args.hold)
+
+                window_ended = time.perf_counter()
+                after = await scrape_metrics(http, args.base_url)
+                cpu = process.cpu_percent(None) if process else None
+                rss = process.memory_info().rss if process else None
+                elapsed = window_ended - window_started
+                active = len(sessions)
+
+                frames_sent = defaultdict(int)
+                for session, previous in zip(sessions, frames_before):
+                    for kind, count in session.frames_sent.items():
+                        frames_sent[kind] += count - previous.get(kind, 0)
+                stt_latencies = [
+                    latency for s in sessions for received, latency in s.stt_latencies
+                    if window_started <= received <= window_ended
+                ]
+
+                step = {
+                    "target_sessions": target,
+                    "active_sessions": active,
+                    "rejected_total": rejected,
+                    "window_sec": round(elapsed, 1),
+                    "setup": percentiles_ms([s.setup_seconds for s in sessions if s.setup_seconds is not None]),
+                    "event_loop_lag": histogram_summary(before, after, "media_event_loop_lag_seconds"),
+                    "ws_send": histogram_summary(before, after, "media_ws_send_seconds"),
+                    "frame_encode": histogram_summary(before, after, "media_frame_encode_seconds"),
+                    "frames_sent_per_sec": {kind: round(count / elapsed, 1) for kind, count in frames_sent.items()},
+                    "frames_sampled": int(counter_delta(before, after, "media_frames_sampled_total")),
+                    "tasks_published": int(counter_delta(before, after, "media_task_publish_seconds_count")),
+                    "stt_messages": int(counter_delta(before, after, "media_stt_messages_total")),
+                    "stt_latency": percentiles_ms(stt_latencies),
+                }
+                if process:
+                    step["cpu_percent"] = round(cpu, 1)
+                    step["cpu_percent_per_session"] = round(cpu / active, 2) if active else None
+                    step["rss_mb"] = round(rss / 2**20, 1)
+                    step["rss_mb_per_session"] = round((rss - baseline_rss) / 2**20 / active, 2) if active else None
+                report_steps.append(step)
+                print_step(step)
+        finally:
+            await asyncio.gather(*(s.close(http) for s in sessions), return_exceptions=True)
+            await stand_in.stop()
+
+    return {"run_id": run_id, "steps": report_steps}
+
+async def wait_until_ready(http: aiohttp.ClientSession, base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with http.get(f"{base_url}/") as resp:
+                if resp.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"media-server not ready at {base_url}")
+
+def print_step(step: dict):
+    lag = step["event_loop_lag"]
+    stt = step["stt_latency"]
+    line = (f"N={step['active_sessions']:>3} (target {step['target_sessions']}, rejected {step['rejected_total']}) | "
+            f"loop lag mean {lag.get('mean_ms')}ms p95≤{lag.get('p95_ms_le')}ms | "
+            f"frames sent/s {step['frames_sent_per_sec']} sampled {step['frames_sampled']} | "
+            f"STT {stt.get('count', 0)} msgs p50 {stt.get('p50_ms')}ms p95 {stt.get('p95_ms')}ms")
+    if "cpu_percent" in step:
+        line += (f" | CPU {step['cpu_percent']}% ({step['cpu_percent_per_session']}%/session)"
+                 f" RSS {step['rss_mb']}MB ({step['rss_mb_per_session']}MB/session)")
+    print(line, flush=True)
+
+# ============== media-server 실행 ==============
+def spawn_media_server(args) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        STT_WS_URL=f"ws://127.0.0.1:{args.stand_in_port}/listen",
+        BACKEND_URL=f"http://127.0.0.1:{args.stand_in_port}",
+        INTERNAL_API_TOKEN="bench-internal-token",
+        CELERY_BROKER_URL="memory://",
+        CELERY_RESULT_BACKEND="cache+memory://",
+        REDIS_URL=args.redis_url,
+        MAX_SESSIONS=str(max(args.steps)),
+    )
+    env.pop("DEEPGRAM_API_KEY", None)
+    port = args.base_url.rsplit(":", 1)[-1].split("/")[0]
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(
+        # media_server_entry: memory:// 브로커 큐를 주기적으로 비워 RSS에 미소비 프레임이 쌓이지 않도록 함
+        [sys.executable, "-m", "uvicorn", "media_server_entry:app", "--app-dir", os.path.join(ROOT, "benchmarks"),
+         "--host", "127.0.0.1", "--port", port, "--log-level", "warning"],
+        cwd=os.path.join(ROOT, "media-server"), env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="media-server 합성 WebRTC 세션 부하 테스트")
+    parser.add_argument("--base-url", default="http://127.0.0.1:18080")
+    parser.add_argument("--spawn", action="store_true", help="media-server를 대체 STT/메모리 브로커로 직접 실행")
+    parser.add_argument("--pid", type=int, help="--spawn 없이 실행 중인 media-server의 PID (CPU/메모리 측정용)")
+    parser.add_argument("--redis-url", default="redis://127.0.0.1:56379/0",
+                        help="WebSocket 허브용 Redis (연결 불가 시 프로세스 내부 전달로 동작)")
+    parser.add_argument("--steps", type=int, nargs="+", default=[1, 5, 10, 20], help="단계별 동시 세션 수")
+    parser.add_argument("--warmup", type=float, default=5.0, help="세션 추가 후 측정 전 대기 시간(초)")
+    parser.add_argument("--hold", type=float, default=30.0, help="단계별 측정 구간(초)")
+    parser.add_argument("--stt-interval", type=float, default=1.0, help="대체 STT 결과 전송 주기(초)")
+    parser.add_argument("--stand-in-port", type=int, default=18765)
+    parser.add_argument("--video-file", help="합성 얼굴 대신 사용할 녹화 클립 (반복 재생)")
+    parser.add_argument("--audio-file", help="합성 음성 대신 사용할 녹화 클립 (반복 재생)")
+    parser.add_argument("--server-log", help="--spawn 시 media-server 로그 저장 경로")
+    parser.add_argument("--json-out", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+    args.steps = sorted(set(args.steps))
+
+    server = spawn_media_server(args) if args.spawn else None
+    try:
+        report = asyncio.run(run_steps(args, server.pid if server else args.pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
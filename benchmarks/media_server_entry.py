@@ -0,0 +1,36 @@
+"""
+media_load.py --spawn 전용 media-server 진입점
+
+memory:// 브로커에는 소비자가 없어, 샘플링된 base64 프레임이 측정 대상 프로세스 안에 계속 쌓이고
+RSS가 세션 수가 아니라 경과 시간에 비례해 늘어납니다. 실제 배포에서는 ai-worker가 소비하므로
+브로커 발행 비용(직렬화, send_task)은 그대로 두고 큐만 주기적으로 비웁니다.
+
+    cd media-server && python -m uvicorn media_server_entry:app --app-dir ../benchmarks
+"""
+import logging
+import os
+import threading
+import time
+
+import main
+
+logger = logging.getLogger("Media-Load-Entry")
+
+DRAIN_INTERVAL = float(os.getenv("BENCH_BROKER_DRAIN_INTERVAL", "0.5"))
+
+def drain_broker():
+    queue = main.celery_app.conf.task_default_queue
+    dropped = 0
+    while True:
+        time.sleep(DRAIN_INTERVAL)
+        try:
+            with main.celery_app.connection_for_write() as conn:
+                dropped += conn.default_channel.queue_purge(queue) or 0
+        except Exception as e:
+            logger.warning(f"브로커 큐 비우기 실패: {e}")
+            continue
+        logger.debug(f"브로커 큐 비움 (누적 {dropped}건)")
+
+threading.Thread(target=drain_broker, name="bench-broker-drain", daemon=True).start()
+
+app = main.app
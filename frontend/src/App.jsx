@@ -23,6 +23,7 @@ function App() {
   // 사용자 입력 상태
   const [userName, setUserName] = useState('');
   const [position, setPosition] = useState('');
+  const [adaptive, setAdaptive] = useState(false); // 답변 기반 꼬리 질문 모드
   
   const videoRef = useRef(null);
   const pcRef = useRef(null);
@@ -77,7 +78,7 @@ function App() {
     }
     console.log(uName, uPos + ' 입력됨');
     try {
-      const sess = await createSession(uName, uPos);
+      const sess = await createSession(uName, uPos, adaptive);
       setSession(sess);
       const qs = await getQuestions(sess.id);
       setQuestions(qs);
@@ -100,14 +101,18 @@ function App() {
 
     ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
-        
-        if (data.type === 'stt_result' && data.text) {
-          // 실시간 STT 결과를 현재 transcript에 추가
-          setTranscript(prev => prev + ' ' + data.text);
-          setFullTranscript(prev => prev + ' ' + data.text);
-          console.log('[STT]:', data.text);
-        }
+        const payload = JSON.parse(event.data);
+        // 서버가 짧은 주기로 모아 보낸 메시지는 batch로 전달됨
+        const messages = payload.type === 'batch' ? payload.messages : [payload];
+
+        messages.forEach((data) => {
+          if (data.type === 'stt_result' && data.text) {
+            // 실시간 STT 결과를 현재 transcript에 추가
+            setTranscript(prev => prev + ' ' + data.text);
+            setFullTranscript(prev => prev + ' ' + data.text);
+            console.log('[STT]:', data.text);
+          }
+        });
       } catch (err) {
         console.error('[WebSocket] Parse error:', err);
       }
@@ -165,16 +170,25 @@ function App() {
     await pc.setRemoteDescription(new RTCSessionDescription(answer));
   };
 
+  // media-server에 답변 구간 알림 (구간별 발화 속도/휴지/음량 지표 계산용)
+  const sendAnswerBoundary = (type, recordId) => {
+    if (wsRef.current && wsRef.current.readyState === WebSocket.OPEN) {
+      wsRef.current.send(JSON.stringify({ type, record_id: recordId }));
+    }
+  };
+
   // 녹음 시작/중지
   const toggleRecording = () => {
     if (isRecording) {
       // 녹음 중지
       setIsRecording(false);
+      sendAnswerBoundary('answer_end', questions[currentIdx].id);
       console.log('[Recording] Stopped');
     } else {
       // 녹음 시작 (새 질문 시작 시 기존 텍스트 초기화)
       setTranscript('');
       setIsRecording(true);
+      sendAnswerBoundary('answer_start', questions[currentIdx].id);
       console.log('[Recording] Started');
     }
   };
@@ -182,13 +196,23 @@ function App() {
   const nextQuestion = async () => {
     // STT로 받아온 실제 텍스트를 제출
     const answerText = transcript.trim() || "답변 내용 없음 (음성 인식 실패 또는 무응답)";
+    if (isRecording) {
+      sendAnswerBoundary('answer_end', questions[currentIdx].id);
+    }
     
     try {
-      await submitAnswer(questions[currentIdx].id, answerText);
+      const submitted = await submitAnswer(questions[currentIdx].id, answerText);
       console.log(`[Submit] Question ${currentIdx + 1} answered:`, answerText);
+
+      // 적응형 모드: 서버가 확정한 꼬리 질문을 목록에 추가
+      let questionCount = questions.length;
+      if (submitted.next_question) {
+        setQuestions(prev => [...prev, submitted.next_question]);
+        questionCount += 1;
+      }
       
       // 다음 질문으로 이동 또는 종료
-      if (currentIdx < questions.length - 1) {
+      if (currentIdx < questionCount - 1) {
         setCurrentIdx(currentIdx + 1);
         setTranscript(''); // 다음 질문을 위해 텍스트 초기화
         setIsRecording(false); // 녹음 상태 리셋
@@ -205,6 +229,12 @@ function App() {
           pcRef.current.close();
           pcRef.current = null;
         }
+        // media-server 측 세션 자원 즉시 해제 (실패해도 유휴 타임아웃으로 정리됨)
+        fetch('http://localhost:8080/hangup', {
+          method: 'POST',
+          body: JSON.stringify({ session_id: session.id }),
+          headers: { 'Content-Type': 'application/json' }
+        }).catch(err => console.warn('[WebRTC] Hangup failed:', err));
         
         // AI 평가 완료 대기 후 결과 조회
         setTimeout(async () => {
@@ -327,6 +357,15 @@ function App() {
                 style={{ width: '100%', padding: '8px', borderRadius: '4px', border: '1px solid #ccc', color: '#333' }}
               />
             </div>
+            <label htmlFor="adaptive" style={{ display: 'flex', alignItems: 'center', gap: '8px' }}>
+              <input
+                id="adaptive"
+                type="checkbox"
+                checked={adaptive}
+                onChange={(e) => setAdaptive(e.target.checked)}
+              />
+              답변 기반 꼬리 질문 모드 (적응형 면접)
+            </label>
           </div>
           <button onClick={() => startInterview(userName, position)}>
             면접 시작하기
@@ -409,6 +448,15 @@ function App() {
                 </pre>
                 <h4 style={{ color: '#10b981', margin: '10px 0' }}>감정 분석:</h4>
                 <p>{r.emotion ? `주요 감정: ${r.emotion.dominant_emotion}` : "분석 대기 중..."}</p>
+                {r.speech && (
+                  <>
+                    <h4 style={{ color: '#f59e0b', margin: '10px 0' }}>음성 지표:</h4>
+                    <p>
+                      발화 속도 {r.speech.speaking_rate_wpm ?? '-'} 어절/분 · 휴지 비율 {Math.round((r.speech.pause_ratio ?? 0) * 100)}%
+                      · 긴 침묵 {r.speech.long_silence_count}회 · 음량 변동 {r.speech.loudness_std_db ?? '-'} dB
+                    </p>
+                  </>
+                )}
               </div>
             </div>
           ))}
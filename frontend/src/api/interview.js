@@ -46,10 +46,11 @@ export const getCurrentUser = async () => {
     return response.data;
 };
 
-export const createSession = async (userName, position) => {
+export const createSession = async (userName, position, adaptive = false) => {
     const response = await api.post('/sessions', {
         user_name: userName,
-        position: position
+        position: position,
+        adaptive: adaptive
     });
     return response.data;
 };
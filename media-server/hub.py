@@ -0,0 +1,189 @@
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Set
+
+from fastapi import WebSocket
+
+from metrics import WS_SEND_SECONDS
+
+logger = logging.getLogger("Media-Server-Hub")
+
+CHANNEL_PREFIX = "media:ws:"
+# WebSocket → WebRTC 소유 레플리카 방향 제어 메시지 (answer_start / answer_end 등)
+CONTROL_PREFIX = "media:ctl:"
+
+class SubscriptionHub:
+    """
+    세션별 WebSocket 구독자 관리 및 메시지 팬아웃 허브
+
+    - 한 세션에 여러 WebSocket(여러 탭/뷰어)이 동시에 구독할 수 있습니다.
+    - Redis pub/sub으로 메시지를 라우팅하므로 WebRTC 연결(STT)과 WebSocket이
+      서로 다른 media-server 레플리카에 붙어 있어도 결과가 전달됩니다.
+    - 반대 방향(클라이언트 → WebRTC 연결을 가진 레플리카)의 제어 메시지는 세션별 제어 채널로 전달합니다.
+    - 작은 메시지는 flush 주기마다 세션 단위로 모아서 한 번에 전송합니다.
+      (2건 이상이면 {"type": "batch", "messages": [...]} 형태)
+    - Redis에 연결할 수 없으면 프로세스 내부 전달로 동작합니다.
+    """
+
+    def __init__(self, redis_url: Optional[str], flush_interval: float = 0.05, max_batch: int = 50):
+        self.redis_url = redis_url
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._subscribers: Dict[str, Set[WebSocket]] = {}
+        self._outbox: Dict[str, List[dict]] = {}
+        self._redis = None
+        self._pubsub = None
+        self._tasks: List[asyncio.Task] = []
+        # 제어 메시지 처리기 (session_id, message), 이 레플리카가 WebRTC 연결을 가진 세션만 구독
+        self.control_handler: Optional[Callable[[str, dict], None]] = None
+        self._controlled: Set[str] = set()
+
+    @property
+    def redis_enabled(self) -> bool:
+        return self._redis is not None
+
+    async def start(self):
+        if self.redis_url:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(self.redis_url)
+                await self._redis.ping()
+                self._pubsub = self._redis.pubsub()
+                self._tasks.append(asyncio.create_task(self._listen()))
+                logger.info(f"✅ Redis pub/sub 허브 연결 성공: {self.redis_url}")
+            except Exception as e:
+                logger.warning(f"⚠️ Redis 연결 실패, 프로세스 내부 전달로 동작합니다: {e}")
+                self._redis = None
+                self._pubsub = None
+        self._tasks.append(asyncio.create_task(self._flush_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self._pubsub is not None:
+            await self._pubsub.close()
+        if self._redis is not None:
+            await self._redis.close()
+
+    async def subscribe(self, session_id: str, websocket: WebSocket):
+        sockets = self._subscribers.setdefault(session_id, set())
+        sockets.add(websocket)
+        # 이 프로세스에 첫 구독자가 생길 때만 Redis 채널 구독
+        if len(sockets) == 1 and self._pubsub is not None:
+            await self._pubsub.subscribe(CHANNEL_PREFIX + session_id)
+        logger.info(f"[{session_id}] 구독자 추가 (현재 {len(sockets)}명)")
+
+    async def unsubscribe(self, session_id: str, websocket: WebSocket):
+        sockets = self._subscribers.get(session_id)
+        if not sockets:
+            return
+        sockets.discard(websocket)
+        if not sockets:
+            del self._subscribers[session_id]
+            self._outbox.pop(session_id, None)
+            if self._pubsub is not None:
+                await self._pubsub.unsubscribe(CHANNEL_PREFIX + session_id)
+        logger.info(f"[{session_id}] 구독자 제거 (현재 {len(sockets)}명)")
+
+    def subscriber_count(self, session_id: str) -> int:
+        return len(self._subscribers.get(session_id, ()))
+
+    async def watch_control(self, session_id: str):
+        """이 레플리카가 세션의 WebRTC 연결을 소유: 다른 레플리카의 WebSocket이 보낸 제어 메시지 수신"""
+        if self._pubsub is None or session_id in self._controlled:
+            return
+        self._controlled.add(session_id)
+        await self._pubsub.subscribe(CONTROL_PREFIX + session_id)
+
+    async def unwatch_control(self, session_id: str):
+        if self._pubsub is None or session_id not in self._controlled:
+            return
+        self._controlled.discard(session_id)
+        await self._pubsub.unsubscribe(CONTROL_PREFIX + session_id)
+
+    async def send_control(self, session_id: str, message: dict) -> bool:
+        """
+        세션의 WebRTC 연결을 가진 레플리카에 제어 메시지 전달
+
+        Returns:
+            bool: 메시지를 받은 레플리카가 있으면 True (Redis 미사용 시 False)
+        """
+        if self._redis is None:
+            return False
+        try:
+            receivers = await self._redis.publish(CONTROL_PREFIX + session_id, json.dumps(message, ensure_ascii=False))
+        except Exception as e:
+            logger.error(f"[{session_id}] 제어 메시지 publish 실패: {e}")
+            return False
+        return receivers > 0
+
+    async def publish(self, session_id: str, message: dict):
+        """세션 구독자 전체(모든 레플리카)에게 메시지 전달"""
+        if self._redis is not None:
+            try:
+                await self._redis.publish(CHANNEL_PREFIX + session_id, json.dumps(message, ensure_ascii=False))
+                return
+            except Exception as e:
+                logger.error(f"[{session_id}] Redis publish 실패, 로컬 전달로 대체: {e}")
+        self._enqueue(session_id, message)
+
+    def _enqueue(self, session_id: str, message: dict):
+        if session_id not in self._subscribers:
+            return
+        self._outbox.setdefault(session_id, []).append(message)
+
+    async def _listen(self):
+        """Redis 채널에서 받은 메시지를 로컬 구독자 outbox에 적재"""
+        while True:
+            try:
+                if not self._pubsub.subscribed:
+                    await asyncio.sleep(self.flush_interval)
+                    continue
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                if channel.startswith(CONTROL_PREFIX):
+                    if self.control_handler is not None:
+                        self.control_handler(channel[len(CONTROL_PREFIX):], json.loads(message["data"]))
+                    continue
+                self._enqueue(channel[len(CHANNEL_PREFIX):], json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis 구독 메시지 처리 에러: {e}")
+                await asyncio.sleep(1.0)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if not self._outbox:
+                continue
+            outbox, self._outbox = self._outbox, {}
+            await asyncio.gather(
+                *(self._flush_session(session_id, messages) for session_id, messages in outbox.items()),
+                return_exceptions=True
+            )
+
+    async def _flush_session(self, session_id: str, messages: List[dict]):
+        sockets = list(self._subscribers.get(session_id, ()))
+        if not sockets:
+            return
+        for start in range(0, len(messages), self.max_batch):
+            chunk = messages[start:start + self.max_batch]
+            payload = chunk[0] if len(chunk) == 1 else {"type": "batch", "messages": chunk}
+            with WS_SEND_SECONDS.time():
+                results = await asyncio.gather(*(ws.send_json(payload) for ws in sockets), return_exceptions=True)
+            for ws, result in zip(sockets, results):
+                if isinstance(result, Exception):
+                    logger.error(f"[{session_id}] WebSocket 전송 실패, 구독 해제: {result}")
+                    await self.unsubscribe(session_id, ws)
+            sockets = list(self._subscribers.get(session_id, ()))
+            if not sockets:
+                return
@@ -5,11 +5,16 @@ import os
 import base64
 import time
 import cv2
-from typing import Dict, Set
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+import aiohttp
+from typing import Dict, Optional, Set
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import Response
 from aiortc import RTCPeerConnection, RTCSessionDescription, MediaStreamTrack
 from aiortc.contrib.media import MediaRelay
 from celery import Celery
+from hub import SubscriptionHub
+from sessions import SessionRegistry, SessionCapacityError
+import metrics
 
 # 1. 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s: %(message)s')
@@ -19,12 +24,50 @@ app = FastAPI()
 relay = MediaRelay()
 
 # 2. Celery 설정 (ai-worker로 감정 분석 요청 전달용)
-celery_app = Celery("ai_worker", broker="redis://redis:6379/0", backend="redis://redis:6379/0")
+REDIS_URL = os.getenv("REDIS_URL") or "redis://redis:6379/0"
+# 부하 테스트 시 memory:// 등으로 교체 가능 (기본값은 Redis)
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL") or REDIS_URL
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND") or REDIS_URL
+celery_app = Celery("ai_worker", broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
 
-# 3. WebSocket 연결 관리 (세션별 WebSocket 저장)
-active_websockets: Dict[str, WebSocket] = {}
+# 3. WebSocket 연결 관리 (세션별 다중 구독자, Redis pub/sub으로 레플리카 간 라우팅)
+WS_FLUSH_INTERVAL = float(os.getenv("WS_FLUSH_INTERVAL", "0.05"))
+hub = SubscriptionHub(REDIS_URL, flush_interval=WS_FLUSH_INTERVAL)
 
-# 4. Deepgram 설정 (STT가 활성화된 경우에만)
+# 4. WebRTC 세션 레지스트리 (peer connection/트랙/태스크 수명 관리)
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "20"))
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "120"))
+# 세션 종료 시 (다른 레플리카의 WebSocket에서 오는) 제어 채널 구독 해제
+registry = SessionRegistry(MAX_SESSIONS, SESSION_IDLE_TIMEOUT, on_close=hub.unwatch_control)
+metrics.ACTIVE_SESSIONS.set_function(lambda: len(registry))
+
+# 적응형 면접용 STT 전사 전달 대상 (backend-core)
+BACKEND_URL = os.getenv("BACKEND_URL", "http://backend:8000")
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+if not INTERNAL_API_TOKEN:
+    # backend-core는 토큰 미설정 시 /internal 호출을 모두 거부하므로 전사/음성 지표 전달을 생략
+    logger.warning("⚠️ INTERNAL_API_TOKEN이 설정되지 않아 backend-core로 전사/음성 지표를 전달하지 않습니다.")
+backend_http: aiohttp.ClientSession = None
+
+# 답변 종료 후 늦게 도착하는 STT 단어를 기다렸다가 음성 지표 전달 (세션 종료와 무관하게 완료)
+SPEECH_WORD_GRACE = float(os.getenv("SPEECH_WORD_GRACE", "1.5"))
+speech_reports: Set[asyncio.Task] = set()
+
+@app.on_event("startup")
+async def on_startup():
+    global backend_http
+    backend_http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+    await hub.start()
+    registry.start()
+    asyncio.create_task(metrics.monitor_event_loop())
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await registry.stop()
+    await hub.stop()
+    await backend_http.close()
+
+# 5. Deepgram 설정 (STT가 활성화된 경우에만)
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
 USE_DEEPGRAM = bool(DEEPGRAM_API_KEY)
 
@@ -43,6 +86,11 @@ if USE_DEEPGRAM:
 else:
     logger.warning("⚠️ DEEPGRAM_API_KEY not set. STT will be disabled.")
 
+# Deepgram 호환 응답을 주는 STT WebSocket (부하 테스트용 로컬 대체 서버 등). 설정 시 Deepgram 대신 사용
+STT_WS_URL = os.getenv("STT_WS_URL")
+if STT_WS_URL:
+    logger.info(f"✅ STT WebSocket 대체 서버 사용: {STT_WS_URL}")
+
 class VideoAnalysisTrack(MediaStreamTrack):
     """비디오 프레임을 추출하여 ai-worker에 감정 분석을 요청하는 트랙"""
     kind = "video"
@@ -55,6 +103,7 @@ class VideoAnalysisTrack(MediaStreamTrack):
 
     async def recv(self):
         frame = await self.track.recv()
+        registry.touch(self.session_id)
         current_time = time.time()
 
         # 2초마다 한 번씩 프레임 추출 (CPU 부하 방지 및 4650G 최적화)
@@ -62,24 +111,221 @@ class VideoAnalysisTrack(MediaStreamTrack):
             self.last_frame_time = current_time
             
             # 프레임을 이미지로 변환
+            encode_started = time.perf_counter()
             img = frame.to_ndarray(format="bgr24")
             _, buffer = cv2.imencode('.jpg', img)
             base64_img = base64.b64encode(buffer).decode('utf-8')
+            metrics.FRAME_ENCODE_SECONDS.observe(time.perf_counter() - encode_started)
+            metrics.FRAMES_SAMPLED.inc()
 
             # ai-worker에 비동기 감정 분석 태스크 전달 (JSON 포맷 데이터)
-            celery_app.send_task(
-                "tasks.vision.analyze_emotion",
-                args=[self.session_id, base64_img]
-            )
-            logger.info(f"[{self.session_id}] 감정 분석 프레임 전송 완료")
+            trace_id = metrics.new_trace_id()
+            with metrics.TASK_PUBLISH_SECONDS.labels(task="tasks.vision.analyze_emotion").time():
+                celery_app.send_task(
+                    "tasks.vision.analyze_emotion",
+                    args=[self.session_id, base64_img],
+                    headers=metrics.task_headers(trace_id, captured_at=current_time)
+                )
+            logger.info(f"[{self.session_id}] 감정 분석 프레임 전송 완료 (trace={trace_id})")
 
         return frame
 
+async def forward_transcript(session_id: str, text: str, is_final: bool):
+    """STT 전사를 backend-core에 전달 (적응형 세션의 꼬리 질문 선행 생성용)"""
+    media_session = registry.get(session_id)
+    if media_session is None or not media_session.forward_transcripts:
+        return
+    if not INTERNAL_API_TOKEN:
+        media_session.forward_transcripts = False
+        return
+    headers = {"X-Internal-Token": INTERNAL_API_TOKEN}
+    async with media_session.forward_lock:
+        if not media_session.forward_transcripts:
+            return
+        try:
+            async with backend_http.post(
+                f"{BACKEND_URL}/internal/sessions/{session_id}/transcript",
+                json={"text": text, "is_final": is_final},
+                headers=headers
+            ) as resp:
+                if resp.status == 200:
+                    data = await resp.json()
+                    media_session.forward_transcripts = bool(data.get("adaptive"))
+                elif resp.status in (403, 503):
+                    # 토큰 불일치/내부 API 비활성화: 세션 내내 재시도해도 같은 결과이므로 전달 중단
+                    media_session.forward_transcripts = False
+                    logger.warning(f"[{session_id}] 전사 전달 거부 (HTTP {resp.status}), 이 세션은 전달을 중단합니다.")
+                else:
+                    logger.warning(f"[{session_id}] 전사 전달 실패: HTTP {resp.status}")
+        except Exception as e:
+            logger.warning(f"[{session_id}] 전사 전달 에러: {e}")
+
+async def report_speech_metrics(session_id: str, speech, segment):
+    """답변 구간의 음성 지표 요약을 backend-core의 해당 InterviewRecord에 저장"""
+    await asyncio.sleep(SPEECH_WORD_GRACE)
+    summary = speech.finish(segment)
+    if not INTERNAL_API_TOKEN:
+        return
+    headers = {"X-Internal-Token": INTERNAL_API_TOKEN}
+    try:
+        async with backend_http.post(
+            f"{BACKEND_URL}/internal/sessions/{session_id}/records/{segment.record_id}/speech-metrics",
+            json=summary,
+            headers=headers
+        ) as resp:
+            if resp.status == 200:
+                metrics.SPEECH_SEGMENTS.inc()
+                logger.info(f"[{session_id}] 음성 지표 전달 완료 (record={segment.record_id}): {summary}")
+            else:
+                logger.warning(f"[{session_id}] 음성 지표 전달 실패: HTTP {resp.status}")
+    except Exception as e:
+        logger.warning(f"[{session_id}] 음성 지표 전달 에러: {e}")
+
+def parse_record_id(value) -> Optional[int]:
+    """양의 정수 또는 숫자 문자열만 record id로 인정"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value > 0 else None
+    if isinstance(value, str) and value.strip().isdecimal():
+        return int(value.strip()) or None
+    return None
+
+async def handle_client_message(session_id: str, raw: str):
+    """
+    프론트엔드 WebSocket 메시지 처리 (answer_start / answer_end로 답변 구간 구분)
+
+    WebSocket과 WebRTC 연결이 다른 레플리카에 있을 수 있으므로, 이 프로세스에 세션이 없으면
+    Redis 제어 채널로 WebRTC 연결을 가진 레플리카에 전달합니다.
+    """
+    try:
+        message = json.loads(raw)
+    except ValueError:
+        logger.debug(f"[{session_id}] Received from client: {raw}")
+        return
+    if not isinstance(message, dict):
+        return
+
+    kind = message.get("type")
+    if kind not in ("answer_start", "answer_end"):
+        return
+    record_id = parse_record_id(message.get("record_id"))
+    # 잘못된 record_id는 무시 (예외로 구독 소켓이 끊기지 않도록)
+    if record_id is None and (kind == "answer_start" or message.get("record_id") is not None):
+        logger.warning(f"[{session_id}] Ignoring {kind} with invalid record_id: {message.get('record_id')!r}")
+        return
+
+    boundary = {"type": kind, "record_id": record_id}
+    if registry.get(session_id) is not None:
+        apply_answer_boundary(session_id, boundary)
+    elif not await hub.send_control(session_id, boundary):
+        logger.warning(f"[{session_id}] {kind}: WebRTC 연결을 가진 레플리카가 없어 답변 구간을 기록하지 못했습니다.")
+
+def apply_answer_boundary(session_id: str, message: dict):
+    """이 프로세스가 WebRTC 연결을 가진 세션의 답변 구간 시작/종료 (끝난 구간은 음성 지표 전달)"""
+    media_session = registry.get(session_id)
+    if media_session is None:
+        logger.warning(f"[{session_id}] {message.get('type')}: 이 레플리카에 세션이 없어 답변 구간을 무시합니다.")
+        return
+    kind, record_id = message.get("type"), message.get("record_id")
+
+    if kind == "answer_start":
+        finished = media_session.speech.start_segment(record_id)
+    else:
+        finished = media_session.speech.end_segment(record_id)
+
+    if finished is not None:
+        task = asyncio.create_task(report_speech_metrics(session_id, media_session.speech, finished))
+        speech_reports.add(task)
+        task.add_done_callback(speech_reports.discard)
+
+# Redis 제어 채널로 받은 답변 구간 (WebSocket이 다른 레플리카에 연결된 경우)
+hub.control_handler = apply_answer_boundary
+
+async def handle_transcript(session_id: str, transcript: str, is_final: bool, words=()):
+    """STT 결과를 세션 구독자에게 전송하고 적응형 세션이면 backend-core로 전달"""
+    metrics.STT_MESSAGES.inc()
+    media_session = registry.get(session_id)
+    if media_session is not None and is_final and words:
+        media_session.speech.add_words(words)
+    stt_data = {
+        "session_id": session_id,
+        "text": transcript,
+        "type": "stt_result",
+        "timestamp": time.time()
+    }
+    logger.info(f"[{session_id}] STT: {transcript}")
+
+    # 허브를 통해 세션 구독자 전체에 실시간 전송
+    await hub.publish(session_id, stt_data)
+
+    # 적응형 세션이면 backend-core로 전사 전달 (STT 루프를 막지 않도록 별도 태스크)
+    registry.spawn(session_id, forward_transcript(session_id, transcript, is_final))
+
+async def start_stt_with_websocket(audio_track: MediaStreamTrack, session_id: str):
+    """STT_WS_URL로 오디오를 전송하고 Deepgram 형식의 결과를 수신"""
+    media_session = registry.get(session_id)
+    if media_session is None:
+        return
+
+    try:
+        async with aiohttp.ClientSession() as http, \
+                http.ws_connect(STT_WS_URL, params={"session_id": session_id}) as ws:
+            logger.info(f"[{session_id}] STT WebSocket 연결 시작됨")
+
+            async def receive_results():
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        continue
+                    try:
+                        data = json.loads(msg.data)
+                        alternatives = (data.get("channel") or {}).get("alternatives") or []
+                        transcript = alternatives[0].get("transcript") if alternatives else None
+                        if transcript:
+                            words = [(w["start"], w["end"]) for w in alternatives[0].get("words") or []]
+                            await handle_transcript(session_id, transcript, data.get("is_final", True), words)
+                    except Exception as e:
+                        logger.error(f"[{session_id}] STT 결과 처리 에러: {e}")
+
+            receiver = asyncio.create_task(receive_results())
+            try:
+                while True:
+                    try:
+                        frame = await audio_track.recv()
+                    except Exception as e:
+                        logger.debug(f"[{session_id}] Audio track recv 에러: {e}")
+                        break
+                    registry.touch(session_id)
+                    await ws.send_bytes(media_session.speech.process(frame))
+            finally:
+                receiver.cancel()
+                logger.info(f"[{session_id}] STT WebSocket 종료됨")
+
+    except Exception as e:
+        logger.error(f"[{session_id}] STT 실행 중 치명적 에러: {str(e)}")
+
+async def analyze_audio_only(audio_track: MediaStreamTrack, session_id: str):
+    """STT 없이 음성 지표만 계산 (단어 수/발화 속도는 비어 있음)"""
+    media_session = registry.get(session_id)
+    if media_session is None:
+        return
+    while True:
+        try:
+            frame = await audio_track.recv()
+        except Exception as e:
+            logger.debug(f"[{session_id}] Audio track recv 에러: {e}")
+            break
+        registry.touch(session_id)
+        media_session.speech.process(frame)
+
 async def start_stt_with_deepgram(audio_track: MediaStreamTrack, session_id: str):
     """Deepgram 실시간 STT 실행 및 WebSocket으로 결과 전송 (SDK v5.3.1 대응)"""
     if not USE_DEEPGRAM:
         logger.warning(f"[{session_id}] Deepgram 비활성화 상태. STT 건너뜀.")
         return
+    media_session = registry.get(session_id)
+    if media_session is None:
+        return
     
     try:
         # Deepgram 비동기 클라이언트 초기화 (SDK 5.x)
@@ -107,18 +353,10 @@ async def start_stt_with_deepgram(audio_track: MediaStreamTrack, session_id: str
                         if alternatives and len(alternatives) > 0:
                             transcript = alternatives[0].transcript
                             if transcript:
-                                stt_data = {
-                                    "session_id": session_id,
-                                    "text": transcript,
-                                    "type": "stt_result",
-                                    "timestamp": time.time()
-                                }
-                                logger.info(f"[{session_id}] STT: {transcript}")
-                                
-                                # WebSocket으로 프론트엔드에 실시간 전송
-                                if session_id in active_websockets:
-                                    ws = active_websockets[session_id]
-                                    await send_to_websocket(ws, stt_data)
+                                words = [(w.start, w.end) for w in getattr(alternatives[0], "words", None) or []]
+                                await handle_transcript(
+                                    session_id, transcript, getattr(message, "is_final", True), words
+                                )
                 except Exception as e:
                     logger.error(f"[{session_id}] on_message 처리 에러: {e}")
 
@@ -145,9 +383,10 @@ async def start_stt_with_deepgram(audio_track: MediaStreamTrack, session_id: str
                 while True:
                     try:
                         frame = await audio_track.recv()
-                        
-                        # 프레임을 ndarray로 변환 후 바이트로 추출하여 Deepgram으로 전송
-                        audio_data = frame.to_ndarray().tobytes()
+                        registry.touch(session_id)
+
+                        # 16kHz mono PCM으로 변환(음성 지표 동시 계산)하여 Deepgram으로 전송
+                        audio_data = media_session.speech.process(frame)
                         await dg_connection.send(audio_data)
                         
                     except Exception as e:
@@ -167,69 +406,101 @@ async def start_stt_with_deepgram(audio_track: MediaStreamTrack, session_id: str
     except Exception as e:
         logger.error(f"[{session_id}] STT 실행 중 치명적 에러: {str(e)}")
 
-async def send_to_websocket(ws: WebSocket, data: dict):
-    """WebSocket으로 데이터 전송 (에러 처리 포함)"""
-    try:
-        await ws.send_json(data)
-    except Exception as e:
-        logger.error(f"WebSocket 전송 실패: {e}")
-
 # ============== WebSocket 엔드포인트 ==============
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """프론트엔드와 실시간 STT 결과 공유를 위한 WebSocket 연결"""
     await websocket.accept()
-    active_websockets[session_id] = websocket
+    await hub.subscribe(session_id, websocket)
     logger.info(f"[{session_id}] ✅ WebSocket 연결 성공")
     
     try:
         # 연결 유지 및 클라이언트로부터 메시지 수신 대기
         while True:
             data = await websocket.receive_text()
-            # 필요 시 클라이언트로부터 받은 메시지 처리
-            logger.debug(f"[{session_id}] Received from client: {data}")
+            # 답변 구간 시작/종료 등 클라이언트 메시지 처리
+            await handle_client_message(session_id, data)
             
     except WebSocketDisconnect:
         logger.info(f"[{session_id}] ❌ WebSocket 연결 종료")
     except Exception as e:
         logger.error(f"[{session_id}] WebSocket 에러: {e}")
     finally:
-        # 연결 종료 시 세션 제거
-        if session_id in active_websockets:
-            del active_websockets[session_id]
-            logger.info(f"[{session_id}] WebSocket 세션 정리 완료")
+        # 연결 종료 시 구독 해제
+        await hub.unsubscribe(session_id, websocket)
+        logger.info(f"[{session_id}] WebSocket 세션 정리 완료")
 
 # ============== WebRTC 엔드포인트 ==============
 @app.post("/offer")
 async def offer(request: Request):
     params = await request.json()
     offer = RTCSessionDescription(sdp=params["sdp"], type=params["type"])
-    session_id = params.get("session_id", "unknown")
+    session_id = str(params.get("session_id", "unknown"))
 
     pc = RTCPeerConnection()
-    logger.info(f"[{session_id}] WebRTC 연결 시도")
+    try:
+        await registry.register(session_id, pc)
+    except SessionCapacityError as e:
+        await pc.close()
+        logger.warning(f"[{session_id}] WebRTC 연결 거부: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
+    # 다른 레플리카에 붙은 WebSocket의 answer_start / answer_end 수신
+    await hub.watch_control(session_id)
+    logger.info(f"[{session_id}] WebRTC 연결 시도 (활성 세션 {len(registry)}/{MAX_SESSIONS})")
 
     @pc.on("track")
     def on_track(track):
         logger.info(f"[{session_id}] Received track: {track.kind}")
+        registry.add_track(session_id, track)
         if track.kind == "audio":
-            asyncio.ensure_future(start_stt_with_deepgram(track, session_id))
+            if STT_WS_URL:
+                start_audio = start_stt_with_websocket
+            elif USE_DEEPGRAM:
+                start_audio = start_stt_with_deepgram
+            else:
+                start_audio = analyze_audio_only
+            registry.spawn(session_id, start_audio(track, session_id))
             logger.info(f"[{session_id}] Audio track processing started (STT enabled)")
         elif track.kind == "video":
-            pc.addTrack(VideoAnalysisTrack(relay.subscribe(track), session_id))
+            analysis_track = VideoAnalysisTrack(relay.subscribe(track), session_id)
+            registry.add_track(session_id, analysis_track)
+            pc.addTrack(analysis_track)
             logger.info(f"[{session_id}] Video track processing started (Emotion analysis enabled)")
         else:
             logger.warning(f"[{session_id}] Unknown track type: {track.kind}")
 
-    await pc.setRemoteDescription(offer)
-    answer = await pc.createAnswer()
-    await pc.setLocalDescription(answer)
+    try:
+        await pc.setRemoteDescription(offer)
+        answer = await pc.createAnswer()
+        await pc.setLocalDescription(answer)
+    except Exception:
+        await registry.close(session_id, "negotiation failed")
+        raise
 
     return {
         "sdp": pc.localDescription.sdp,
         "type": pc.localDescription.type
     }
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus 스크레이프 엔드포인트"""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+@app.post("/hangup")
+async def hangup(request: Request):
+    """면접 종료 시 세션의 WebRTC 자원을 즉시 해제"""
+    params = await request.json()
+    session_id = str(params.get("session_id", "unknown"))
+    closed = await registry.close(session_id, "hangup")
+    return {"session_id": session_id, "closed": closed}
+
+@app.get("/sessions")
+async def list_sessions():
+    """프로세스별 활성 세션 및 자원 사용 현황"""
+    return registry.stats()
+
 @app.get("/")
 async def root():
     return {
@@ -237,7 +508,10 @@ async def root():
         "status": "running",
         "websocket_endpoint": "/ws/{session_id}",
         "webrtc_endpoint": "/offer",
-        "deepgram_enabled": USE_DEEPGRAM
+        "deepgram_enabled": USE_DEEPGRAM,
+        "stt_ws_url": STT_WS_URL,
+        "active_sessions": len(registry),
+        "redis_hub_enabled": hub.redis_enabled
     }
 
 if __name__ == "__main__":
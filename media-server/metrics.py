@@ -0,0 +1,53 @@
+"""
+Prometheus 지표 (media-server)
+
+프레임 샘플링/인코딩 시간, Celery 발행 시간, STT 메시지 수, WebSocket 전송 시간,
+음성 지표 계산 시간, 이벤트 루프 지연을 기록하고 /metrics로 노출합니다.
+"""
+import asyncio
+import time
+import uuid
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+FRAMES_SAMPLED = Counter("media_frames_sampled_total", "감정 분석용으로 샘플링된 비디오 프레임 수")
+FRAME_ENCODE_SECONDS = Histogram(
+    "media_frame_encode_seconds", "프레임 JPEG/base64 인코딩 시간", buckets=LATENCY_BUCKETS
+)
+TASK_PUBLISH_SECONDS = Histogram(
+    "media_task_publish_seconds", "Celery 태스크 발행 시간", ["task"], buckets=LATENCY_BUCKETS
+)
+STT_MESSAGES = Counter("media_stt_messages_total", "수신한 STT 결과 메시지 수")
+WS_SEND_SECONDS = Histogram(
+    "media_ws_send_seconds", "WebSocket 배치 전송 시간", buckets=LATENCY_BUCKETS
+)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "media_event_loop_lag_seconds", "이벤트 루프 지연 (예정 대비 늦게 깨어난 시간)", buckets=LATENCY_BUCKETS
+)
+SPEECH_ANALYSIS_SECONDS = Histogram(
+    "media_speech_analysis_seconds", "오디오 프레임당 리샘플링 + 음성 지표 계산 시간",
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+)
+SPEECH_SEGMENTS = Counter("media_speech_segments_total", "backend-core로 전달한 답변 음성 지표 수")
+ACTIVE_SESSIONS = Gauge("media_active_sessions", "활성 WebRTC 세션 수")
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+def task_headers(trace_id: str, **extra) -> dict:
+    """send_task(headers=...)용 추적 헤더 (ai-worker가 큐 대기/종단 지연 계산에 사용)"""
+    headers = {"trace_id": trace_id, "enqueued_at": time.time()}
+    headers.update(extra)
+    return headers
+
+async def monitor_event_loop(interval: float = 0.5):
+    """주기적으로 sleep하여 예정 시각보다 늦게 깨어난 만큼을 루프 지연으로 기록"""
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG_SECONDS.observe(max(time.perf_counter() - started - interval, 0.0))
+
+def render_latest():
+    return generate_latest(), CONTENT_TYPE_LATEST
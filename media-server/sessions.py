@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from aiortc import RTCPeerConnection, MediaStreamTrack
+
+from speech import SpeechAnalyzer
+
+logger = logging.getLogger("Media-Server-Sessions")
+
+class SessionCapacityError(Exception):
+    """프로세스당 동시 세션 상한 초과"""
+
+class MediaSession:
+    """면접 세션 하나가 점유하는 WebRTC 자원 (peer connection, 트랙, 백그라운드 태스크)"""
+
+    def __init__(self, session_id: str, pc: RTCPeerConnection):
+        self.session_id = session_id
+        self.pc = pc
+        self.tracks: List[MediaStreamTrack] = []
+        self.tasks: Set[asyncio.Task] = set()
+        self.created_at = time.time()
+        self.last_activity = time.monotonic()
+        self.closed = False
+        # 적응형 세션이 아니라고 응답받으면 backend-core로 전사 전달 중단
+        self.forward_transcripts = True
+        self.forward_lock = asyncio.Lock()  # 전사 조각을 수신 순서대로 전달
+        self.speech = SpeechAnalyzer()  # 답변 단위 음성 지표 (발화 속도, 휴지, 음량)
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self.last_activity
+
+    def stats(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "connection_state": self.pc.connectionState,
+            "tracks": len(self.tracks),
+            "tasks": len([t for t in self.tasks if not t.done()]),
+            "age_seconds": round(time.time() - self.created_at, 1),
+            "idle_seconds": round(self.idle_seconds(), 1),
+        }
+
+    async def close(self, reason: str):
+        if self.closed:
+            return
+        self.closed = True
+        logger.info(f"[{self.session_id}] 세션 자원 정리 시작 (사유: {reason})")
+
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks.clear()
+
+        for track in self.tracks:
+            try:
+                track.stop()
+            except Exception as e:
+                logger.debug(f"[{self.session_id}] track stop 에러: {e}")
+        self.tracks.clear()
+
+        try:
+            await self.pc.close()
+        except Exception as e:
+            logger.warning(f"[{self.session_id}] peer connection close 에러: {e}")
+        logger.info(f"[{self.session_id}] 세션 자원 정리 완료")
+
+class SessionRegistry:
+    """
+    프로세스 내 WebRTC 세션 레지스트리
+
+    - 세션별 peer connection, 트랙, 백그라운드 태스크(STT 등)를 추적합니다.
+    - 연결 실패/종료, 유휴 시간 초과, 명시적 hangup 시 모든 자원을 해제합니다.
+    - 동시 세션 수를 max_sessions로 제한하여 장시간 실행 시에도 메모리를 일정하게 유지합니다.
+    """
+
+    def __init__(self, max_sessions: int, idle_timeout: float, reap_interval: float = 10.0,
+                 on_close: Optional[Callable[[str], Awaitable[None]]] = None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
+        # 세션이 레지스트리에서 제거될 때 호출 (예: 제어 채널 구독 해제)
+        self.on_close = on_close
+        self._sessions: Dict[str, MediaSession] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> Optional[MediaSession]:
+        return self._sessions.get(session_id)
+
+    async def register(self, session_id: str, pc: RTCPeerConnection) -> MediaSession:
+        # 같은 세션의 재연결(새 offer)이면 이전 연결을 먼저 정리
+        previous = self._sessions.get(session_id)
+        if previous is not None:
+            await self.close(session_id, "reconnected")
+        if len(self._sessions) >= self.max_sessions:
+            raise SessionCapacityError(f"Too many concurrent sessions ({self.max_sessions})")
+
+        media_session = MediaSession(session_id, pc)
+        self._sessions[session_id] = media_session
+
+        @pc.on("connectionstatechange")
+        async def on_connectionstatechange():
+            logger.info(f"[{session_id}] Connection state: {pc.connectionState}")
+            if pc.connectionState in ("failed", "closed"):
+                await self.close(session_id, f"connection {pc.connectionState}", media_session)
+
+        return media_session
+
+    def add_track(self, session_id: str, track: MediaStreamTrack):
+        media_session = self._sessions.get(session_id)
+        if media_session is not None:
+            media_session.tracks.append(track)
+
+    def spawn(self, session_id: str, coro) -> Optional[asyncio.Task]:
+        """세션에 귀속된 백그라운드 태스크 실행 (세션 종료 시 함께 취소됨)"""
+        media_session = self._sessions.get(session_id)
+        if media_session is None:
+            coro.close()
+            return None
+        task = asyncio.create_task(coro)
+        media_session.tasks.add(task)
+        task.add_done_callback(media_session.tasks.discard)
+        return task
+
+    def touch(self, session_id: str):
+        media_session = self._sessions.get(session_id)
+        if media_session is not None:
+            media_session.touch()
+
+    async def close(self, session_id: str, reason: str, expected: Optional[MediaSession] = None) -> bool:
+        media_session = self._sessions.get(session_id)
+        # 이미 새 연결로 교체된 세션을 이전 연결의 이벤트가 닫지 않도록 확인
+        if media_session is None or (expected is not None and media_session is not expected):
+            if expected is not None:
+                await expected.close(reason)
+            return False
+        del self._sessions[session_id]
+        await media_session.close(reason)
+        if self.on_close is not None:
+            try:
+                await self.on_close(session_id)
+            except Exception as e:
+                logger.warning(f"[{session_id}] 세션 종료 후처리 실패: {e}")
+        return True
+
+    async def close_all(self, reason: str):
+        for session_id in list(self._sessions):
+            await self.close(session_id, reason)
+
+    def stats(self) -> dict:
+        return {
+            "active_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "idle_timeout": self.idle_timeout,
+            "sessions": [s.stats() for s in self._sessions.values()],
+        }
+
+    def start(self):
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def stop(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+            self._reaper = None
+        await self.close_all("shutdown")
+
+    async def _reap_idle(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            for session_id, media_session in list(self._sessions.items()):
+                if media_session.idle_seconds() > self.idle_timeout:
+                    logger.warning(f"[{session_id}] {self.idle_timeout:.0f}초 동안 미디어 수신 없음, 세션 종료")
+                    try:
+                        await self.close(session_id, "idle timeout", media_session)
+                    except Exception as e:
+                        logger.error(f"[{session_id}] 유휴 세션 정리 에러: {e}")
@@ -0,0 +1,162 @@
+"""
+답변 단위 음성 지표 (발화 속도, 휴지 비율, 긴 침묵 횟수, 음량 변동)
+
+aiortc 오디오 프레임을 STT 전송 형식(16kHz mono s16)으로 변환하면서 10ms 창 단위 RMS 음량을
+NumPy로 계산하고, 구간 누적값만 갱신하므로 세션 길이와 무관하게 메모리가 일정합니다.
+발화 속도는 STT 단어 타임스탬프를 같은 스트림 시계(STT로 보낸 누적 샘플 수)에 맞춰 계산합니다.
+
+구간은 프론트엔드가 WebSocket으로 보내는 answer_start / answer_end(record_id) 메시지로 나뉩니다.
+"""
+import os
+import time
+from typing import Iterable, List, Optional, Tuple
+
+import av
+import numpy as np
+
+from metrics import SPEECH_ANALYSIS_SECONDS
+
+SAMPLE_RATE = 16000
+WINDOW_SAMPLES = SAMPLE_RATE // 100  # 10ms
+SILENCE_DBFS = float(os.getenv("SPEECH_SILENCE_DBFS", "-45"))
+PAUSE_MIN_SECONDS = float(os.getenv("SPEECH_PAUSE_MIN_SECONDS", "0.3"))
+LONG_SILENCE_SECONDS = float(os.getenv("SPEECH_LONG_SILENCE_SECONDS", "2.0"))
+MAX_CLOSING_SEGMENTS = 4
+# 무음 구간 기준을 10ms 창 수로 변환 (부동소수 누적 오차 없이 정수 비교)
+PAUSE_MIN_WINDOWS = round(PAUSE_MIN_SECONDS * SAMPLE_RATE / WINDOW_SAMPLES)
+LONG_SILENCE_WINDOWS = round(LONG_SILENCE_SECONDS * SAMPLE_RATE / WINDOW_SAMPLES)
+
+class SpeechSegment:
+    """답변 하나(녹음 시작~중지)의 누적 지표"""
+
+    def __init__(self, record_id: int, started_at: float):
+        self.record_id = record_id
+        self.started_at = started_at
+        self.ended_at: Optional[float] = None
+
+        self.total_seconds = 0.0
+        self.voiced_seconds = 0.0
+        self.silence_windows = 0  # 호출 경계를 넘어 이어지는 현재 무음 구간 길이 (10ms 창 수)
+        self.pause_count = 0
+        self.long_silence_count = 0
+
+        # 유성 구간 음량(dBFS)의 평균/분산 (병렬 Welford 누적)
+        self.loudness_count = 0
+        self.loudness_mean = 0.0
+        self.loudness_m2 = 0.0
+
+        self.word_count = 0
+
+    def add_windows(self, dbfs: np.ndarray):
+        window_seconds = WINDOW_SAMPLES / SAMPLE_RATE
+        voiced = dbfs > SILENCE_DBFS
+        self.total_seconds += len(dbfs) * window_seconds
+        self.voiced_seconds += int(voiced.sum()) * window_seconds
+
+        # 무음 구간 run-length: 유성 창마다 직전 유성 창(또는 시작) 이후의 무음 창 수
+        voiced_idx = np.flatnonzero(voiced)
+        if len(voiced_idx) == 0:
+            self.silence_windows += len(voiced)
+        else:
+            runs = np.diff(voiced_idx, prepend=-1) - 1
+            runs[0] += self.silence_windows
+            self._count_silences(runs)
+            self.silence_windows = len(voiced) - 1 - int(voiced_idx[-1])
+
+        values = dbfs[voiced]
+        if len(values):
+            count = self.loudness_count + len(values)
+            delta = float(values.mean()) - self.loudness_mean
+            self.loudness_m2 += float(values.var()) * len(values) + delta ** 2 * self.loudness_count * len(values) / count
+            self.loudness_mean += delta * len(values) / count
+            self.loudness_count = count
+
+    def _count_silences(self, runs: np.ndarray):
+        """끝난 무음 구간(창 수) 중 휴지/긴 침묵 기준을 넘는 구간 수 누적"""
+        self.pause_count += int(np.count_nonzero(runs >= PAUSE_MIN_WINDOWS))
+        self.long_silence_count += int(np.count_nonzero(runs >= LONG_SILENCE_WINDOWS))
+
+    def _end_silence(self):
+        self._count_silences(np.array([self.silence_windows]))
+        self.silence_windows = 0
+
+    def contains(self, timestamp: float) -> bool:
+        return self.started_at <= timestamp and (self.ended_at is None or timestamp < self.ended_at)
+
+    def summary(self) -> dict:
+        self._end_silence()
+        minutes = self.total_seconds / 60
+        voiced_minutes = self.voiced_seconds / 60
+        return {
+            "duration_sec": round(self.total_seconds, 2),
+            "voiced_sec": round(self.voiced_seconds, 2),
+            "pause_ratio": round(1 - self.voiced_seconds / self.total_seconds, 3) if self.total_seconds else None,
+            "pause_count": self.pause_count,
+            "long_silence_count": self.long_silence_count,
+            "word_count": self.word_count,
+            "speaking_rate_wpm": round(self.word_count / minutes, 1) if minutes else None,
+            "articulation_rate_wpm": round(self.word_count / voiced_minutes, 1) if voiced_minutes else None,
+            "loudness_mean_dbfs": round(self.loudness_mean, 1) if self.loudness_count else None,
+            "loudness_std_db": round((self.loudness_m2 / self.loudness_count) ** 0.5, 2) if self.loudness_count else None,
+        }
+
+class SpeechAnalyzer:
+    """세션 하나의 오디오 스트림 분석기 (STT 루프에서 프레임마다 process 호출)"""
+
+    def __init__(self):
+        self.resampler = av.AudioResampler(format="s16", layout="mono", rate=SAMPLE_RATE)
+        self.stream_seconds = 0.0
+        self.segment: Optional[SpeechSegment] = None
+        # 종료됐지만 늦게 도착하는 STT 단어를 기다리는 구간
+        self.closing: List[SpeechSegment] = []
+        self._remainder = np.zeros(0, dtype=np.int16)
+
+    def process(self, frame) -> bytes:
+        """aiortc 오디오 프레임 → STT 전송용 16kHz mono PCM (구간 진행 중이면 지표 갱신)"""
+        started = time.perf_counter()
+        chunks = [resampled.to_ndarray().reshape(-1) for resampled in self.resampler.resample(frame)]
+        pcm = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int16)
+        self.stream_seconds += len(pcm) / SAMPLE_RATE
+
+        if self.segment is not None:
+            samples = np.concatenate((self._remainder, pcm))
+            usable = len(samples) - len(samples) % WINDOW_SAMPLES
+            self._remainder = samples[usable:]
+            if usable:
+                windows = samples[:usable].reshape(-1, WINDOW_SAMPLES).astype(np.float32) / 32768.0
+                rms = np.sqrt(np.mean(windows * windows, axis=1))
+                self.segment.add_windows(20 * np.log10(np.maximum(rms, 1e-6)))
+
+        SPEECH_ANALYSIS_SECONDS.observe(time.perf_counter() - started)
+        return pcm.tobytes()
+
+    def start_segment(self, record_id: int) -> Optional[SpeechSegment]:
+        """새 답변 구간 시작 (진행 중인 구간이 있으면 종료하여 반환)"""
+        previous = self.end_segment()
+        self.segment = SpeechSegment(record_id, self.stream_seconds)
+        return previous
+
+    def end_segment(self, record_id: Optional[int] = None) -> Optional[SpeechSegment]:
+        segment = self.segment
+        if segment is None or (record_id is not None and segment.record_id != record_id):
+            return None
+        segment.ended_at = self.stream_seconds
+        self.segment = None
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self.closing = self.closing[-(MAX_CLOSING_SEGMENTS - 1):] + [segment]
+        return segment
+
+    def finish(self, segment: SpeechSegment) -> dict:
+        """단어 대기 시간이 지난 구간의 요약 생성"""
+        if segment in self.closing:
+            self.closing.remove(segment)
+        return segment.summary()
+
+    def add_words(self, words: Iterable[Tuple[float, float]]):
+        """STT 최종 결과의 단어 (start, end) 타임스탬프를 해당 구간에 반영"""
+        segments = self.closing + ([self.segment] if self.segment is not None else [])
+        for start, _ in words:
+            for segment in segments:
+                if segment.contains(start):
+                    segment.word_count += 1
+                    break
@@ -0,0 +1,18 @@
+"""
+backend-core / ai-worker 공통 DB 스키마 및 쿼리
+
+테이블 정의, 인덱스, 엔진 설정, 핫 패스 쿼리를 한 곳에서 관리합니다.
+각 서비스는 PYTHONPATH에 shared/를 추가하여 사용합니다.
+"""
+from interview_schema.models import User, InterviewSession, InterviewRecord
+from interview_schema.database import DATABASE_URL, create_db_engine, init_db, upgrade_schema
+
+__all__ = [
+    "User",
+    "InterviewSession",
+    "InterviewRecord",
+    "DATABASE_URL",
+    "create_db_engine",
+    "init_db",
+    "upgrade_schema",
+]
@@ -0,0 +1,203 @@
+"""
+직무/질문/일자별 평가 점수 집계 (technical_score, communication_score)
+
+ai-worker가 평가를 저장하는 같은 트랜잭션 안에서 이전 평가와의 차이만큼 집계 테이블을 갱신하므로
+대시보드 조회는 답변 누적 수와 무관하게 집계 행만 읽습니다. (재평가로 점수가 바뀌면 이전 점수를 빼고 새 점수를 더함)
+
+rebuild_aggregates는 원본 평가에서 집계를 다시 계산합니다. 주기적 보정과 최초 백필에 사용합니다.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Float, and_, case, delete, func, insert, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+
+from interview_schema.models import (
+    InterviewSession, InterviewRecord, PositionScoreStats, QuestionScoreStats, DailyScoreStats
+)
+
+SCORE_KEYS = {"technical": "technical_score", "communication": "communication_score"}
+TOTAL_COLUMNS = [
+    "answer_count", "technical_sum", "technical_count", "communication_sum", "communication_count",
+]
+# rebuild_aggregates 동시 실행 방지용 advisory lock 키
+REBUILD_LOCK_KEY = 40_040
+# 잠금 순서를 고정하여 여러 워커가 같은 집계 행을 갱신할 때 교착 상태를 방지
+AGGREGATES = [
+    (PositionScoreStats, ("position",)),
+    (QuestionScoreStats, ("position", "question_text")),
+    (DailyScoreStats, ("position", "day")),
+]
+
+def extract_score(evaluation: Optional[Dict[str, Any]], key: str) -> Optional[float]:
+    """숫자 점수만 인정 (rebuild_aggregates의 jsonb_typeof = 'number' 조건과 동일)"""
+    if not evaluation:
+        return None
+    value = evaluation.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+def _contribution(evaluation: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    totals = {"answer_count": 1 if isinstance(evaluation, dict) else 0}
+    for name, key in SCORE_KEYS.items():
+        score = extract_score(evaluation, key)
+        totals[f"{name}_sum"] = score or 0.0
+        totals[f"{name}_count"] = 0 if score is None else 1
+    return totals
+
+def apply_evaluations(db: Session, evaluations: Dict[int, Dict[str, Any]]) -> int:
+    """
+    평가 결과를 저장하고 집계 테이블을 증분 갱신합니다 (commit은 호출자가 결정).
+
+    Returns:
+        int: 저장된 레코드 수
+    """
+    if not evaluations:
+        return 0
+
+    rows = db.exec(
+        select(
+            InterviewRecord.id, InterviewRecord.evaluation, InterviewRecord.question_text,
+            InterviewRecord.answered_at, InterviewRecord.created_at, InterviewSession.position
+        )
+        .join(InterviewSession, InterviewSession.id == InterviewRecord.session_id)
+        .where(InterviewRecord.id.in_(list(evaluations)))
+        .order_by(InterviewRecord.id)
+        .with_for_update(of=InterviewRecord)
+    ).all()
+    if not rows:
+        return 0
+
+    db.execute(update(InterviewRecord), [{"id": row.id, "evaluation": evaluations[row.id]} for row in rows])
+
+    deltas: Dict[type, Dict[tuple, Dict[str, Any]]] = {model: {} for model, _ in AGGREGATES}
+    for row in rows:
+        old, new = _contribution(row.evaluation), _contribution(evaluations[row.id])
+        keys = {
+            "position": row.position,
+            "question_text": row.question_text,
+            "day": (row.answered_at or row.created_at).date(),
+        }
+        for model, key_columns in AGGREGATES:
+            key = tuple(keys[column] for column in key_columns)
+            total = deltas[model].setdefault(key, {
+                **{column: keys[column] for column in key_columns},
+                **dict.fromkeys(TOTAL_COLUMNS, 0),
+            })
+            for column in TOTAL_COLUMNS:
+                total[column] += new[column] - old[column]
+
+    now = datetime.utcnow()
+    for model, key_columns in AGGREGATES:
+        changed = [
+            {**deltas[model][key], "updated_at": now}
+            for key in sorted(deltas[model])
+            if any(deltas[model][key][column] for column in TOTAL_COLUMNS)
+        ]
+        if changed:
+            _upsert_totals(db, model, key_columns, changed)
+    return len(rows)
+
+def _upsert_totals(db: Session, model, key_columns, rows: List[dict]):
+    table = model.__table__
+    statement = pg_insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={
+            **{column: table.c[column] + statement.excluded[column] for column in TOTAL_COLUMNS},
+            "updated_at": statement.excluded.updated_at,
+        }
+    )
+    db.execute(statement, rows)
+
+def _score_sql(key: str):
+    value = InterviewRecord.evaluation[key]
+    return case((func.jsonb_typeof(value) == "number", value.astext.cast(Float)))
+
+def rebuild_aggregates(db: Session) -> Dict[str, int]:
+    """
+    원본 평가로 집계 테이블 전체를 다시 계산합니다 (주기적 보정/최초 백필, commit은 호출자가 결정).
+
+    재계산 동안 집계 테이블을 SHARE ROW EXCLUSIVE로 잠가 증분 갱신(INSERT ... ON CONFLICT)을 막습니다.
+    DELETE로 행이 사라진 사이에 증분 갱신이 새 행을 넣으면 INSERT ... SELECT가 같은 키로 unique 위반이
+    나므로, 증분 갱신은 재계산이 커밋된 뒤 재계산된 행 위에 반영됩니다. (잠금 전에 커밋된 평가는 재계산에 포함)
+    여러 워커가 동시에 시작해도 재계산끼리는 advisory lock으로 순서대로 실행됩니다.
+
+    Returns:
+        dict: 집계 테이블별 재계산된 행 수
+    """
+    db.execute(select(func.pg_advisory_xact_lock(REBUILD_LOCK_KEY)))
+    tables = ", ".join(model.__table__.name for model, _ in AGGREGATES)
+    db.execute(text(f"LOCK TABLE {tables} IN SHARE ROW EXCLUSIVE MODE"))
+    technical = _score_sql(SCORE_KEYS["technical"])
+    communication = _score_sql(SCORE_KEYS["communication"])
+    group_values = {
+        "position": InterviewSession.position,
+        "question_text": InterviewRecord.question_text,
+        "day": func.date(func.coalesce(InterviewRecord.answered_at, InterviewRecord.created_at)),
+    }
+
+    rebuilt = {}
+    for model, key_columns in AGGREGATES:
+        groups = [group_values[column].label(column) for column in key_columns]
+        source = (
+            select(
+                *groups,
+                func.count().label("answer_count"),
+                func.coalesce(func.sum(technical), 0.0).label("technical_sum"),
+                func.count(technical).label("technical_count"),
+                func.coalesce(func.sum(communication), 0.0).label("communication_sum"),
+                func.count(communication).label("communication_count"),
+                func.now().label("updated_at"),
+            )
+            .select_from(InterviewRecord)
+            .join(InterviewSession, InterviewSession.id == InterviewRecord.session_id)
+            # 평가 없음은 SQL NULL 또는 JSON null로 저장될 수 있으므로 객체인 경우만 집계
+            .where(func.jsonb_typeof(InterviewRecord.evaluation) == "object")
+            .group_by(*groups)
+        )
+        table = model.__table__
+        db.execute(delete(table))
+        result = db.execute(insert(table).from_select(
+            [*key_columns, *TOTAL_COLUMNS, "updated_at"], source
+        ))
+        rebuilt[table.name] = result.rowcount
+    return rebuilt
+
+# ============== 조회 (대시보드) ==============
+def _averages(row) -> dict:
+    return {
+        "answer_count": row.answer_count,
+        "technical_avg": round(row.technical_sum / row.technical_count, 3) if row.technical_count else None,
+        "communication_avg": round(row.communication_sum / row.communication_count, 3) if row.communication_count else None,
+        "updated_at": row.updated_at,
+    }
+
+def position_summaries(db: Session) -> List[dict]:
+    rows = db.exec(select(PositionScoreStats).order_by(PositionScoreStats.position)).all()
+    return [{"position": row.position, **_averages(row)} for row in rows if row.answer_count > 0]
+
+def question_summaries(db: Session, position: str, limit: int = 50) -> List[dict]:
+    rows = db.exec(
+        select(QuestionScoreStats)
+        .where(QuestionScoreStats.position == position, QuestionScoreStats.answer_count > 0)
+        .order_by(QuestionScoreStats.answer_count.desc())
+        .limit(limit)
+    ).all()
+    return [{"question": row.question_text, **_averages(row)} for row in rows]
+
+def daily_trend(db: Session, position: str, start: date, end: date) -> List[dict]:
+    """[start, end] 구간의 일자별 평균 (답변이 없는 날은 생략)"""
+    rows = db.exec(
+        select(DailyScoreStats)
+        .where(and_(
+            DailyScoreStats.position == position,
+            DailyScoreStats.day >= start,
+            DailyScoreStats.day <= end,
+            DailyScoreStats.answer_count > 0,
+        ))
+        .order_by(DailyScoreStats.day)
+    ).all()
+    return [{"day": row.day, **_averages(row)} for row in rows]
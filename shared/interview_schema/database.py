@@ -0,0 +1,84 @@
+import os
+import time
+import logging
+from typing import Optional
+from sqlmodel import SQLModel, create_engine
+from sqlalchemy import text
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from interview_schema.models import User, InterviewSession, InterviewRecord
+
+logger = logging.getLogger("Database")
+
+# 모든 서비스가 같은 기본 호스트(docker-compose의 db 서비스)를 사용
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://admin:1234@db:5432/interview_db")
+
+# create_all은 기존 테이블에 컬럼을 추가하지 않으므로 이후 추가된 컬럼은 여기서 보완
+ADDED_COLUMNS = [
+    ("interviewrecord", "speech_metrics", "JSONB"),
+    ("interviewsession", "adaptive", "BOOLEAN NOT NULL DEFAULT FALSE"),
+]
+# (session_id, "order") 복합 인덱스가 session_id 단일 인덱스를 대체
+DROPPED_INDEXES = [
+    "ix_interviewrecord_session_id",
+]
+
+def create_db_engine(echo: bool = False, url: Optional[str] = None, **kwargs) -> Engine:
+    return create_engine(
+        url or DATABASE_URL,
+        echo=echo,
+        pool_pre_ping=True, # 연결이 끊겼는지 미리 확인하는 옵션
+        **kwargs
+    )
+
+# 인덱스 존재 및 유효성 (CONCURRENTLY 생성이 중단되면 INVALID 인덱스가 남음)
+INDEX_VALID = text("""
+    SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+    WHERE c.relname = :name AND pg_table_is_visible(c.oid)
+""")
+
+def upgrade_schema(engine: Engine):
+    """
+    기존 DB에 누락된 컬럼/인덱스 보완 (테이블은 create_all이 생성)
+
+    기존 테이블의 인덱스는 CREATE INDEX CONCURRENTLY로 만들어 대용량 interviewrecord에서도
+    생성 중 쓰기를 막지 않습니다. 대체된 인덱스는 새 인덱스가 준비된 뒤에 삭제합니다.
+    """
+    with engine.begin() as conn:
+        for table, column, column_type in ADDED_COLUMNS:
+            conn.execute(text(f'ALTER TABLE {table} ADD COLUMN IF NOT EXISTS "{column}" {column_type}'))
+
+    # CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 autocommit 연결 사용
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for model in (User, InterviewSession, InterviewRecord):
+            for index in model.__table__.indexes:
+                valid = conn.execute(INDEX_VALID, {"name": index.name}).scalar()
+                if valid:
+                    continue
+                if valid is False:
+                    logger.warning(f"⚠️ 유효하지 않은 인덱스 {index.name}를 다시 생성합니다.")
+                    conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                logger.info(f"인덱스 생성 중 (CONCURRENTLY): {index.name}")
+                ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=conn.dialect))
+                conn.exec_driver_sql(ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1))
+        for index_name in DROPPED_INDEXES:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+
+def init_db(engine: Engine, max_retries: int = 10):
+    """DB 연결 시도 및 테이블 생성 (재시도 로직 포함)"""
+    for i in range(max_retries):
+        try:
+            logger.info(f"데이터베이스 연결 시도 중... ({i+1}/{max_retries})")
+            SQLModel.metadata.create_all(engine)
+            upgrade_schema(engine)
+            logger.info("✅ 데이터베이스 테이블 생성 및 연결 성공")
+            return
+        except OperationalError as e:
+            if i < max_retries - 1:
+                logger.warning(f"⚠️ DB 연결 실패, 3초 후 재시도합니다... 에러: {e}")
+                time.sleep(3)
+            else:
+                logger.error("❌ DB 연결 실패: 최대 재시도 횟수를 초과했습니다.")
+                raise e
@@ -0,0 +1,86 @@
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import Index
+from sqlalchemy.dialects.postgresql import JSONB
+from typing import Optional, Dict, Any
+from datetime import date, datetime
+
+class User(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    username: str = Field(index=True, unique=True)
+    hashed_password: str
+    full_name: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class InterviewSession(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: Optional[int] = Field(default=None, foreign_key="user.id", index=True)
+    user_name: str
+    position: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    status: str = Field(default="started") # started, completed
+    adaptive: bool = Field(default=False) # 적응형 면접 (2번째 이후 질문은 지원자 답변에 의존)
+
+    emotion_summary: Optional[Dict[str, Any]] = Field(
+        default=None,
+        sa_column=Column(JSONB)
+    )
+
+class InterviewRecord(SQLModel, table=True):
+    """질문과 답변을 하나의 테이블에서 관리"""
+    __table_args__ = (
+        # 세션별 질문 목록/결과 조회 (WHERE session_id = ? ORDER BY "order")
+        Index("ix_interviewrecord_session_order", "session_id", "order"),
+        # 평가 결과 JSONB 필터 (evaluation @> '{...}', evaluation ? 'key')
+        Index("ix_interviewrecord_evaluation_gin", "evaluation", postgresql_using="gin"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    session_id: int = Field(foreign_key="interviewsession.id")
+
+    # 질문 관련
+    question_text: str
+    order: int
+
+    # 답변 관련 (초기에는 None)
+    answer_text: Optional[str] = None
+
+    # 태스크 결과 (Solar LLM 평가 및 감정 분석)
+    evaluation: Optional[Dict[str, Any]] = Field(
+        default=None,
+        sa_column=Column(JSONB)
+    )
+    emotion_summary: Optional[Dict[str, Any]] = Field(
+        default=None,
+        sa_column=Column(JSONB)
+    )
+    # media-server가 오디오 스트림에서 계산한 음성 지표 (발화 속도, 휴지 비율, 긴 침묵, 음량 변동)
+    speech_metrics: Optional[Dict[str, Any]] = Field(
+        default=None,
+        sa_column=Column(JSONB)
+    )
+
+    answered_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ScoreTotals(SQLModel):
+    """평가 점수 누적값 (평균 = 합계 / 개수, 점수가 없는 평가는 개수에서 제외)"""
+    answer_count: int = 0
+    technical_sum: float = 0.0
+    technical_count: int = 0
+    communication_sum: float = 0.0
+    communication_count: int = 0
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class PositionScoreStats(ScoreTotals, table=True):
+    """직무별 평가 점수 집계"""
+    position: str = Field(primary_key=True)
+
+class QuestionScoreStats(ScoreTotals, table=True):
+    """직무·질문별 평가 점수 집계"""
+    position: str = Field(primary_key=True)
+    question_text: str = Field(primary_key=True)
+
+class DailyScoreStats(ScoreTotals, table=True):
+    """직무·일자별(answered_at, UTC) 평가 점수 집계"""
+    position: str = Field(primary_key=True)
+    day: date = Field(primary_key=True)
@@ -0,0 +1,98 @@
+"""
+서비스 공통 핫 패스 쿼리
+
+문장 객체를 모듈 로드 시 한 번만 만들고 값은 bindparam으로 분리해 두었으므로, 요청마다 쿼리를
+새로 구성하지 않고 SQLAlchemy 컴파일 캐시를 그대로 재사용합니다. 주석의 인덱스는 각 쿼리가
+의존하는 인덱스이며 benchmarks/query_plans.py로 실제 실행 계획을 확인할 수 있습니다.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Session, select
+
+from interview_schema.models import User, InterviewSession, InterviewRecord
+
+# ix_interviewrecord_session_order: 세션 질문 목록/결과 (정렬까지 인덱스로 처리)
+SESSION_RECORDS = (
+    select(InterviewRecord)
+    .where(InterviewRecord.session_id == bindparam("session_id"))
+    .order_by(InterviewRecord.order)
+)
+
+# ix_user_username (unique): 회원가입 중복 확인, 로그인
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+
+# PK: 평가/감정 결과 저장 (조회 없이 UPDATE 한 번)
+SET_RECORD_EVALUATION = (
+    update(InterviewRecord)
+    .where(InterviewRecord.id == bindparam("record_id"))
+    .values(evaluation=bindparam("evaluation", type_=JSONB))
+)
+SET_RECORD_EMOTION = (
+    update(InterviewRecord)
+    .where(InterviewRecord.id == bindparam("record_id"))
+    .values(emotion_summary=bindparam("emotion", type_=JSONB))
+)
+SET_SESSION_EMOTION = (
+    update(InterviewSession)
+    .where(InterviewSession.id == bindparam("session_id"))
+    .values(emotion_summary=bindparam("emotion", type_=JSONB))
+)
+
+# PK: 답변 완료 레코드 keyset 페이지네이션 (재평가 배치)
+ANSWERED_RECORDS_PAGE = (
+    select(InterviewRecord.id, InterviewRecord.question_text, InterviewRecord.answer_text)
+    .where(InterviewRecord.answer_text.is_not(None), InterviewRecord.id > bindparam("after_id"))
+    .order_by(InterviewRecord.id)
+    .limit(bindparam("limit"))
+)
+ANSWERED_RECORDS_BY_IDS = (
+    select(InterviewRecord.id, InterviewRecord.question_text, InterviewRecord.answer_text)
+    .where(InterviewRecord.answer_text.is_not(None), InterviewRecord.id.in_(bindparam("record_ids", expanding=True)))
+    .order_by(InterviewRecord.id)
+)
+ANSWERED_RECORDS_COUNT = select(func.count(InterviewRecord.id)).where(
+    InterviewRecord.answer_text.is_not(None),
+    InterviewRecord.id > bindparam("after_id")
+)
+
+# ix_interviewrecord_evaluation_gin: 평가 결과 JSONB 포함 조건 (evaluation @> :criteria)
+RECORDS_BY_EVALUATION = (
+    select(InterviewRecord)
+    .where(InterviewRecord.evaluation.contains(bindparam("criteria", type_=JSONB)))
+    .order_by(InterviewRecord.id)
+    .limit(bindparam("limit"))
+)
+
+def session_records(db: Session, session_id: int) -> List[InterviewRecord]:
+    return list(db.exec(SESSION_RECORDS, params={"session_id": session_id}).all())
+
+def user_by_username(db: Session, username: str) -> Optional[User]:
+    return db.exec(USER_BY_USERNAME, params={"username": username}).first()
+
+def set_record_evaluation(db: Session, record_id: int, evaluation: Dict[str, Any]) -> bool:
+    result = db.execute(SET_RECORD_EVALUATION, {"record_id": record_id, "evaluation": evaluation})
+    return result.rowcount > 0
+
+def set_record_emotion(db: Session, record_id: int, emotion: Dict[str, Any]) -> bool:
+    result = db.execute(SET_RECORD_EMOTION, {"record_id": record_id, "emotion": emotion})
+    return result.rowcount > 0
+
+def set_session_emotion(db: Session, session_id: int, emotion: Dict[str, Any]) -> bool:
+    result = db.execute(SET_SESSION_EMOTION, {"session_id": session_id, "emotion": emotion})
+    return result.rowcount > 0
+
+def answered_records_page(db: Session, after_id: int, limit: int) -> List[Tuple[int, str, str]]:
+    return list(db.exec(ANSWERED_RECORDS_PAGE, params={"after_id": after_id, "limit": limit}).all())
+
+def answered_records_by_ids(db: Session, record_ids: List[int]) -> List[Tuple[int, str, str]]:
+    if not record_ids:
+        return []
+    return list(db.exec(ANSWERED_RECORDS_BY_IDS, params={"record_ids": list(record_ids)}).all())
+
+def count_answered_records(db: Session, after_id: int = 0) -> int:
+    return db.exec(ANSWERED_RECORDS_COUNT, params={"after_id": after_id}).one()
+
+def records_by_evaluation(db: Session, criteria: Dict[str, Any], limit: int = 100) -> List[InterviewRecord]:
+    return list(db.exec(RECORDS_BY_EVALUATION, params={"criteria": criteria, "limit": limit}).all())